@@ -64,6 +64,11 @@ class AttackablePiece(Exception):
     """ A piece is added to a position from which it can attack another. """
 
 
+class SearchCancelled(Exception):
+
+    """ A search in progress is stopped by its cancellation. """
+
+
 # Expose important classes to the root of the module. These are not
 # lexicographically sorted to avoid cyclic imports.
 from chessboard.pieces import (
@@ -71,6 +76,7 @@ from chessboard.pieces import (
     King, Queen, Rook, Bishop, Knight,
     PIECE_LABELS, PIECE_CLASSES)
 from chessboard.board import Board
+from chessboard.solution import Solution
 from chessboard.solver import Permutations, SolverContext
 from chessboard.benchmark import Benchmark
 
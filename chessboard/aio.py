@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015-2017 Kevin Deldycke <kevin@deldycke.com>
+#                         and contributors.
+# All Rights Reserved.
+#
+# This program is Free Software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+
+""" Asynchronous iteration over solutions, for asyncio applications.
+
+Requires Python 3.5 or newer. The module avoids the ``async`` and ``await``
+keywords, so the package still compiles on older versions.
+"""
+
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals
+)
+
+import asyncio
+import threading
+import time
+
+from chessboard import SearchCancelled
+
+# Maximum number of solutions per batch.
+BATCH_SIZE = 1000
+
+# Maximum delay, in seconds, before a partial batch is delivered.
+BATCH_INTERVAL = 0.1
+
+
+class AsyncSolutions(object):
+    """ Asynchronous iterator over batches of solutions.
+
+    Solutions are pulled from a blocking iterator in an executor, so the
+    event loop keeps running while searching. Each step produces a list of
+    solutions, either full of ``batch_size`` solutions or, if solutions are
+    slow to come, holding those found within ``interval`` seconds.
+
+    Cancelling the task waiting on a batch, or calling :meth:`cancel`, stops
+    the search and closes the blocking iterator. The executor's thread can't
+    be interrupted within a search step, so the search stops after its next
+    solution, or at its next node if it checks the ``cancellation`` event.
+    """
+
+    def __init__(
+            self, solutions, batch_size=BATCH_SIZE, interval=BATCH_INTERVAL,
+            executor=None, loop=None, cancellation=None):
+        """ Wrap the blocking ``solutions`` iterator.
+
+        Batches are searched in ``executor``, or in the default executor of
+        the ``loop`` running the iteration.
+
+        ``cancellation`` is a :class:`threading.Event` set on cancellation,
+        which the search checks to raise :exc:`.SearchCancelled`. See
+        :attr:`.SolverContext.cancelled`.
+        """
+        assert batch_size > 0
+        self.solutions = iter(solutions)
+        self.batch_size = batch_size
+        self.interval = interval
+        self.executor = executor
+        self.loop = loop
+        self.cancellation = cancellation
+        self.cancelled = False
+        self.exhausted = False
+        # Held while the blocking iterator runs.
+        self.lock = threading.Lock()
+
+    def __repr__(self):
+        return '<AsyncSolutions: batch_size={}, cancelled={}>'.format(
+            self.batch_size, self.cancelled)
+
+    def __aiter__(self):
+        return self
+
+    def __anext__(self):
+        """ Return a future of the next batch of solutions. """
+        if self.loop is None:
+            self.loop = asyncio.get_event_loop()
+        batch = self.loop.create_future()
+        if self.cancelled or self.exhausted:
+            batch.set_exception(StopAsyncIteration())
+            return batch
+        fetched = self.loop.run_in_executor(self.executor, self.fetch)
+
+        def deliver(fetched):
+            """ Forward the outcome of the search to the batch. """
+            if batch.cancelled():
+                return
+            if fetched.cancelled():
+                batch.cancel()
+            elif fetched.exception() is not None:
+                batch.set_exception(fetched.exception())
+            elif not fetched.result():
+                batch.set_exception(StopAsyncIteration())
+            else:
+                batch.set_result(fetched.result())
+
+        def abort(batch):
+            """ Stop the search if the consumer gave up waiting. """
+            if batch.cancelled():
+                self.cancel()
+
+        fetched.add_done_callback(deliver)
+        batch.add_done_callback(abort)
+        return batch
+
+    def fetch(self):
+        """ Search the next batch of solutions. Runs in the executor. """
+        batch = []
+        with self.lock:
+            deadline = time.time() + self.interval
+            while not self.cancelled:
+                try:
+                    batch.append(next(self.solutions))
+                except StopIteration:
+                    self.exhausted = True
+                    break
+                # Raised once cancelled, the search is closed along.
+                except SearchCancelled:
+                    break
+                if len(batch) >= self.batch_size or time.time() >= deadline:
+                    break
+            # A running iterator can only be closed from its own thread.
+            if self.cancelled:
+                self.close()
+                return []
+        return batch
+
+    def close(self):
+        """ Close the blocking iterator, if it supports it. """
+        close = getattr(self.solutions, 'close', None)
+        if close is not None:
+            close()
+
+    def cancel(self):
+        """ Stop the search at its next solution, or node. """
+        self.cancelled = True
+        if self.cancellation is not None:
+            self.cancellation.set()
+        # Close the iterator right away if no search is running. Otherwise
+        # the running search closes it.
+        if self.lock.acquire(False):
+            try:
+                self.close()
+            finally:
+                self.lock.release()
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015-2017 Kevin Deldycke <kevin@deldycke.com>
+#                         and contributors.
+# All Rights Reserved.
+#
+# This program is Free Software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+
+""" Solve many puzzles in a single run.
+
+Puzzles are described by JSON objects, with the same keys as the parameters
+of :class:`.SolverContext`, e.g.::
+
+    {"id": "8-queens", "length": 8, "height": 8, "queen": 8}
+
+Besides an ``id`` tagging their results, puzzles can set their ``symmetry``
+mode, if they are ``count_only``, and a ``limit`` to the number of solutions.
+"""
+
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals
+)
+
+import json
+import multiprocessing
+from collections import OrderedDict
+from itertools import islice
+
+from chessboard import SolverContext
+from chessboard.formats import group_by_label
+from chessboard.results import ResultCache
+from chessboard.solver import SYMMETRY_MODES
+
+# Result cache of the current worker process. See :func:`init_worker`.
+worker_cache = None
+
+# Maximal number of puzzles of the same board dimensions sent at once to a
+# worker process. See :func:`geometry_chunks`.
+CHUNK_SIZE = 8
+
+
+def read_puzzles(lines):
+    """ Parse puzzle definitions from JSON Lines.
+
+    Blank lines are skipped. Puzzles without an ``id`` are tagged by their
+    line number. Malformed lines produce an ``error`` record tagged by their
+    line number, which :func:`solve_puzzle` passes through, so they don't
+    abort the batch.
+    """
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            puzzle = json.loads(line)
+            if not isinstance(puzzle, dict):
+                raise ValueError('puzzle is not an object.')
+        except ValueError as expt:
+            yield OrderedDict([
+                ('id', number), ('error', 'ValueError: {}'.format(expt))])
+            continue
+        puzzle.setdefault('id', number)
+        yield puzzle
+
+
+def solve_puzzle(puzzle, cache=None, count_only=False):
+    """ Solve a puzzle and return its result, tagged with its ``id``.
+
+    Results hold the count of solutions and, unless ``count_only`` is set or
+    overridden by the puzzle, their linear positions grouped by piece label.
+    The search stops after the ``limit`` of the puzzle, if any. Invalid
+    puzzles get an ``error`` message instead.
+
+    Counts and solutions are looked up in ``cache`` first. See
+    :class:`.ResultCache`.
+    """
+    params = dict(puzzle)
+    result = OrderedDict([('id', params.pop('id', None))])
+    # Malformed puzzle, see :func:`read_puzzles`.
+    if 'error' in params:
+        result['error'] = params['error']
+        return result
+    symmetry = params.pop('symmetry', None)
+    count_only = params.pop('count_only', count_only)
+    limit = params.pop('limit', None)
+    try:
+        if symmetry not in SYMMETRY_MODES:
+            raise ValueError('Unknown symmetry mode {!r}.'.format(symmetry))
+        if limit is not None and not (isinstance(limit, int) and limit > 0):
+            raise ValueError('Limit {!r} is not a positive integer.'.format(
+                limit))
+        solver = SolverContext(**params)
+    # Parameters are validated by assertions and by pieces lookups.
+    except (AssertionError, KeyError, TypeError, ValueError) as expt:
+        result['error'] = expt.__class__.__name__
+        if str(expt):
+            result['error'] += ': {}'.format(expt)
+        return result
+
+    if count_only and not limit:
+        result['count'] = solver.count(symmetry, cache=cache)
+        return result
+
+    placements = islice(solver.solutions(symmetry, cache=cache), limit)
+    if count_only:
+        result['count'] = sum(1 for _ in placements)
+    else:
+        population = solver.population
+        solutions = [
+            group_by_label(population, placement)
+            for placement in placements]
+        result['count'] = len(solutions)
+        result['solutions'] = solutions
+    return result
+
+
+def init_worker(cache_path):
+    """ Open the result cache of a worker process. """
+    global worker_cache
+    if cache_path:
+        worker_cache = ResultCache(cache_path)
+
+
+def solve_task(params):
+    """ Solve a puzzle in a worker process. See :func:`solve_many`. """
+    puzzle, count_only = params
+    return solve_puzzle(puzzle, worker_cache, count_only)
+
+
+def solve_chunk(params):
+    """ Solve a chunk of puzzles in a worker process, and return their
+    results. See :func:`solve_many`. """
+    puzzles, count_only = params
+    return [
+        solve_puzzle(puzzle, worker_cache, count_only) for puzzle in puzzles]
+
+
+def geometry_chunks(puzzles, size=CHUNK_SIZE):
+    """ Group puzzles by board dimensions, in chunks of at most ``size``
+    puzzles.
+
+    Chunks are produced as soon as they are full, and the remaining ones
+    once all puzzles are read. Puzzles with invalid dimensions are grouped
+    together.
+    """
+    pending = OrderedDict()
+    for puzzle in puzzles:
+        geometry = (puzzle.get('length'), puzzle.get('height'))
+        if not all(isinstance(value, int) for value in geometry):
+            geometry = None
+        chunk = pending.setdefault(geometry, [])
+        chunk.append(puzzle)
+        if len(chunk) == size:
+            yield pending.pop(geometry)
+    for chunk in pending.values():
+        yield chunk
+
+
+def solve_many(puzzles, workers=1, count_only=False, cache_path=None):
+    """ Solve puzzles and generate their results. See :func:`solve_puzzle`.
+
+    Puzzles are spread over a pool of ``workers`` processes, in which case
+    results are produced as soon as their chunk is solved, in no particular
+    order. Chunks only hold puzzles of the same board dimensions, see
+    :func:`geometry_chunks`. Workers live for the whole batch, so each one
+    computes territory tables of a chunk at most once, and keeps those of
+    the board dimensions it already met. See :attr:`.Board.territory_tables`.
+
+    Results are cached in the SQLite database at ``cache_path`` if provided.
+    """
+    if workers == 1:
+        cache = ResultCache(cache_path) if cache_path else None
+        try:
+            for puzzle in puzzles:
+                yield solve_puzzle(puzzle, cache, count_only)
+        finally:
+            if cache is not None:
+                cache.close()
+        return
+
+    pool = multiprocessing.Pool(
+        processes=workers, initializer=init_worker, initargs=(cache_path, ))
+    try:
+        for results in pool.imap_unordered(solve_chunk, (
+                (chunk, count_only) for chunk in geometry_chunks(puzzles))):
+            for result in results:
+                yield result
+    finally:
+        pool.terminate()
+        pool.join()
@@ -27,35 +27,160 @@ from __future__ import (
     unicode_literals
 )
 
+import math
 import platform
-import time
 from collections import OrderedDict
 from os import path
+from timeit import default_timer
 
 import pandas
 import seaborn
 from cpuinfo import get_cpu_info
 from numpy import median
 
-from chessboard import PIECE_LABELS, SolverContext, __version__
+from chessboard import PIECE_LABELS, Board, Piece, SolverContext, __version__
+
+# Default number of untimed runs of a scenario, warming up caches.
+WARMUPS = 1
+
+# Default number of timed runs of a scenario.
+REPETITIONS = 5
+
+# Default significance level of regressions.
+ALPHA = 0.01
+
+# Default minimal slowdown of the median execution time to be reported as a
+# regression, relative to the baseline.
+THRESHOLD = 0.05
+
+# Columns identifying a measured scenario.
+SCENARIO_IDS = ['length', 'height'] + list(PIECE_LABELS) + [
+    'engine', 'method']
+
+# Context columns not identifying the system results were obtained on. The
+# actual frequency of the CPU varies from one run to another, and baselines
+# are usually obtained with another version of the solver.
+VARYING_CONTEXT = ['chessboard', 'cpu_freq_actual']
 
 
 def run_scenario(params):
-    """ Run one scenario and returns execution time and number of solutions.
+    """ Run one scenario and returns execution times and number of solutions.
+
+    The ``method`` parameter selects the solver's API to measure: either
+    ``solve`` to enumerate all solutions, or ``count`` to only count them.
+    The ``engine`` parameter defaults to ``auto``.
+
+    The scenario is run ``warmups`` times untimed, then ``repetitions`` times
+    timed. Execution times are returned as ``timings``. Territory caches are
+    flushed first, so scenarii don't benefit from tables left by previous
+    ones in the same worker.
 
     Also returns initial parameters in the response to keep the results
     associated with the initial context.
     """
-    solver = SolverContext(**params)
-    start = time.time()
-    count = sum(1 for _ in solver.solve())
-    execution_time = time.time() - start
+    params = params.copy()
+    method = params.pop('method', 'solve')
+    warmups = params.pop('warmups', 0)
+    repetitions = params.pop('repetitions', 1)
+    params.setdefault('engine', 'auto')
+    Board.territory_tables.clear()
+    Piece.territory_cache.clear()
+    timings = []
+    for run in range(warmups + repetitions):
+        solver = SolverContext(**params)
+        start = default_timer()
+        if method == 'count':
+            count = solver.count()
+        else:
+            count = sum(1 for _ in solver.solve())
+        if run >= warmups:
+            timings.append(default_timer() - start)
     params.update({
+        'method': method,
         'solutions': count,
-        'execution_time': execution_time})
+        'timings': timings})
     return params
 
 
+def select_context(results, context):
+    """ Return results obtained in ``context``, a mapping of context columns
+    to their values. Empty values match missing ones, as CSV files don't
+    tell them apart. """
+    for label, value in context.items():
+        expected = str(value) if value else ''
+        results = results[results[label].fillna('').map(str) == expected]
+    return results
+
+
+def percentile(values, fraction):
+    """ Return the percentile of values, interpolated between closest ranks.
+    """
+    values = sorted(values)
+    rank = (len(values) - 1) * fraction
+    lower = int(math.floor(rank))
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (rank - lower)
+
+
+def summarize(timings):
+    """ Return minimum, median and interquartile range of execution times.
+    """
+    return OrderedDict([
+        ('runs', len(timings)),
+        ('min', min(timings)),
+        ('median', percentile(timings, 0.5)),
+        ('iqr', percentile(timings, 0.75) - percentile(timings, 0.25))])
+
+
+def u_statistic(samples, baseline):
+    """ Count pairs of samples and baseline values in which the sample is
+    greater, ties counting for half. This is the Mann-Whitney U statistic.
+    """
+    return sum(
+        1 if value > reference else 0.5 if value == reference else 0
+        for value in samples for reference in baseline)
+
+
+def mann_whitney(samples, baseline):
+    """ Return the p-value of samples not being greater than the baseline.
+
+    One-sided Mann-Whitney U test, which makes no assumption on the
+    distribution of execution times. The p-value is exact without ties, and
+    approximated by a normal distribution otherwise.
+    """
+    n, m = len(samples), len(baseline)
+    u = u_statistic(samples, baseline)
+    values = list(samples) + list(baseline)
+    ties = [values.count(value) for value in set(values)]
+
+    if all(count == 1 for count in ties):
+        # Number of arrangements of n samples and m baseline values, by U.
+        # Built by adding values in increasing order: a new sample value is
+        # greater than all baseline values already placed.
+        counts = {(0, j): [1] for j in range(m + 1)}
+        for i in range(1, n + 1):
+            counts[(i, 0)] = [1]
+            for j in range(1, m + 1):
+                with_sample = [0] * j + counts[(i - 1, j)]
+                without = counts[(i, j - 1)]
+                size = max(len(with_sample), len(without))
+                with_sample += [0] * (size - len(with_sample))
+                without = without + [0] * (size - len(without))
+                counts[(i, j)] = [
+                    left + right for left, right in zip(with_sample, without)]
+        distribution = counts[(n, m)]
+        return sum(distribution[int(u):]) / sum(distribution)
+
+    mean = n * m / 2
+    variance = n * m / 12 * (
+        n + m + 1 - sum(t ** 3 - t for t in ties) / ((n + m) * (n + m - 1)))
+    if not variance:
+        return 1.0
+    # Continuity correction.
+    z = (u - mean - 0.5) / math.sqrt(variance)
+    return math.erfc(z / math.sqrt(2)) / 2
+
+
 class Benchmark(object):
 
     """ Defines benchmark suite and utility to save and render the results. """
@@ -64,16 +189,17 @@ class Benchmark(object):
         # Tiny boards
         {'length': 3, 'height': 3, 'king': 2, 'rook': 1},
         {'length': 4, 'height': 4, 'rook': 2, 'knight': 4},
+    ] + [
         # n queens problems.
-        {'length': 1, 'height': 1, 'queen': 1},
-        {'length': 2, 'height': 2, 'queen': 2},
-        {'length': 3, 'height': 3, 'queen': 3},
-        {'length': 4, 'height': 4, 'queen': 4},
-        {'length': 5, 'height': 5, 'queen': 5},
-        {'length': 6, 'height': 6, 'queen': 6},
-        {'length': 7, 'height': 7, 'queen': 7},
-        {'length': 8, 'height': 8, 'queen': 8},
-        # {'length': 9, 'height': 9, 'queen': 9},
+        {'length': size, 'height': size, 'queen': size}
+        for size in range(1, 15)
+    ] + [
+        # n queens problems on specialized and generic engines, to compare
+        # with the default one.
+        {'length': size, 'height': size, 'queen': size, 'engine': engine}
+        for engine, sizes in [('dlx', range(8, 12)), ('backtracking', [8, 9])]
+        for size in sizes
+    ] + [
         # Big family.
         {'length': 5, 'height': 5,
          'king': 2, 'queen': 2, 'bishop': 2, 'knight': 1},
@@ -83,6 +209,9 @@ class Benchmark(object):
         #  'king': 2, 'queen': 2, 'bishop': 2, 'knight': 1},
     ]
 
+    # Solver's methods to measure on each scenario.
+    methods = ['solve', 'count']
+
     # Data are going in a CSV file along this file.
     csv_filepath = path.join(path.dirname(__file__), 'benchmark.csv')
 
@@ -113,23 +242,125 @@ class Benchmark(object):
 
     # Sorted column IDs.
     column_ids = ['length', 'height'] + list(PIECE_LABELS) + [
-        'solutions', 'execution_time'] + list(context)
+        'engine', 'method', 'solutions', 'execution_time'] + list(context)
 
-    def __init__(self):
-        """ Initialize the result database. """
+    def __init__(self, csv_filepath=None):
+        """ Initialize the result database, stored at ``csv_filepath`` if
+        provided. """
+        if csv_filepath is not None:
+            self.csv_filepath = csv_filepath
         self.results = pandas.DataFrame(columns=self.column_ids)
 
+    @classmethod
+    def jobs(cls, warmups=WARMUPS, repetitions=REPETITIONS):
+        """ Generate parameters of all scenarii for each measured method. """
+        for method in cls.methods:
+            for scenario in cls.scenarii:
+                params = scenario.copy()
+                params.update({
+                    'method': method,
+                    'warmups': warmups,
+                    'repetitions': repetitions})
+                yield params
+
     def load_csv(self):
         """ Load old benchmark results from CSV. """
         if path.exists(self.csv_filepath):
-            self.results = self.results.append(
-                pandas.read_csv(self.csv_filepath))
+            # Context values are read as strings, as numeric-looking ones
+            # would otherwise be parsed as numbers.
+            self.results = pandas.concat([
+                self.results, pandas.read_csv(
+                    self.csv_filepath,
+                    dtype={label: str for label in self.context})],
+                ignore_index=True)
+            # Results predating the method column were all produced by
+            # enumeration, and those predating the engine column by the
+            # generic search.
+            self.results['method'] = self.results['method'].fillna('solve')
+            self.results['engine'] = self.results['engine'].fillna(
+                'backtracking')
 
     def add(self, new_results):
-        """ Add new benchmark results. """
+        """ Add new benchmark results.
+
+        Each timed run of a scenario gets its own row.
+        """
+        rows = []
         for result in new_results:
-            result.update(self.context)
-            self.results = self.results.append(result, ignore_index=True)
+            result = result.copy()
+            for execution_time in result.pop('timings'):
+                row = dict(result, execution_time=execution_time)
+                row.update(self.context)
+                rows.append(row)
+        self.results = pandas.concat([
+            self.results, pandas.DataFrame(rows, columns=self.column_ids)],
+            ignore_index=True)
+
+    def timings(self, context=None):
+        """ Return execution times of all runs, indexed by scenario ID.
+
+        Scenario IDs are tuples of :data:`SCENARIO_IDS` values, absent pieces
+        counting as 0. Only runs obtained in ``context`` are returned, if
+        provided. See :func:`select_context`.
+        """
+        if context is None:
+            results = self.results.copy()
+        else:
+            results = select_context(self.results, context).copy()
+        results[list(PIECE_LABELS)] = results[list(PIECE_LABELS)].fillna(0)
+        timings = OrderedDict()
+        for _, row in results.iterrows():
+            scenario = tuple(
+                row[column] if column in ('engine', 'method')
+                else int(row[column])
+                for column in SCENARIO_IDS)
+            timings.setdefault(scenario, []).append(row['execution_time'])
+        return timings
+
+    def compare(
+            self, baseline=None, alpha=ALPHA, threshold=THRESHOLD,
+            baseline_version=None):
+        """ Summarize execution times of each scenario, and compare them to
+        the ``baseline`` benchmark if provided.
+
+        A scenario regresses if its execution times are significantly greater
+        than the baseline's at the ``alpha`` level, and its median is slower
+        by more than ``threshold``, relative to the baseline's median.
+
+        Only baseline results obtained on the same system are compared, with
+        any version of the solver unless ``baseline_version`` is provided.
+        Raise :exc:`ValueError` if there is none.
+        """
+        if baseline is not None:
+            context = OrderedDict(
+                (label, value) for label, value in self.context.items()
+                if label not in VARYING_CONTEXT)
+            if baseline_version is not None:
+                context['chessboard'] = baseline_version
+            references = baseline.timings(context)
+            if not references:
+                raise ValueError(
+                    'No baseline result obtained in the context of the '
+                    'benchmark.')
+        rows = []
+        for scenario, timings in self.timings().items():
+            row = OrderedDict(zip(SCENARIO_IDS, scenario))
+            row.update(summarize(timings))
+            if baseline is not None:
+                # Scenarii missing from the baseline can't regress.
+                row.update([
+                    ('baseline_median', None), ('change', None),
+                    ('p_value', None), ('regression', False)])
+                reference = references.get(scenario)
+                if reference:
+                    row['baseline_median'] = percentile(reference, 0.5)
+                    row['change'] = row['median'] / row['baseline_median'] - 1
+                    row['p_value'] = mann_whitney(timings, reference)
+                    row['regression'] = bool(
+                        row['p_value'] < alpha and row['change'] > threshold)
+            rows.append(row)
+        return pandas.DataFrame(rows).sort_values(
+            by=SCENARIO_IDS).reset_index(drop=True)
 
     def save_csv(self):
         """ Dump all results to CSV. """
@@ -153,16 +384,16 @@ class Benchmark(object):
         nqueens = nqueens[nqueens['length'] == nqueens['queen']]
         nqueens = nqueens[nqueens['height'] == nqueens['queen']]
 
+        # Only keep the engine selected by default.
+        nqueens = nqueens[nqueens['engine'] == 'auto']
+
         # Filters out results not obtained from this system.
-        for label, value in self.context.items():
-            if not value:
-                nqueens = nqueens[nqueens[label].map(pandas.isnull)]
-            else:
-                nqueens = nqueens[nqueens[label] == value]
+        nqueens = select_context(nqueens, self.context)
 
         plot = seaborn.factorplot(
             x='queen',
             y='execution_time',
+            hue='method',
             data=nqueens.sort(columns='queen'),
             estimator=median,
             kind='bar',
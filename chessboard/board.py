@@ -27,8 +27,6 @@ from __future__ import (
     unicode_literals
 )
 
-from operator import or_
-
 from chessboard import (
     PIECE_CLASSES,
     AttackablePiece,
@@ -37,6 +35,7 @@ from chessboard import (
     OccupiedPosition,
     VulnerablePosition
 )
+from chessboard.cache import LRUCache
 
 
 class Board(object):
@@ -48,13 +47,14 @@ class Board(object):
     * occupied by another piece;
     * directly reachable by another piece.
 
-    Internal states of the board are materialized by a vector. A vector is a
-    simple iterable for which each element represent a square.
+    Internal states of the board are materialized by bitmasks. A bitmask is a
+    plain, arbitrary-precision :keyword:`int` for which the bit at position
+    ``i`` represent the square of linear index ``i``. Checking and updating
+    these states are then reduced to a couple of bitwise operations, instead
+    of full scans of the board.
 
-    For :class:`.Piece` we use a :keyword:`bytearray` so we can pack a lot of
-    states in memory for caching. But here for boards, we prefer a common
-    :keyword:`list` of :keyword:`bool` as it seems Python is a little bit
-    faster dealing with these.
+    Vectors are still available for convenience. A vector is a simple iterable
+    for which each element represent a square.
 
     2D positions on the board are noted ``(x, y)``::
 
@@ -74,6 +74,11 @@ class Board(object):
     * bottom-right position is ``(n-1, m-1)``.
     """
 
+    # Territories of all kinds of pieces at all positions, shared by all
+    # boards of the same dimensions. See the territories property below. Only
+    # tables of the most recently used dimensions are kept.
+    territory_tables = LRUCache()
+
     def __init__(self, length, height):
         """ Initialize board dimensions. """
         self.length = length
@@ -85,6 +90,12 @@ class Board(object):
         # Ordered list of linear indexes of all squares.
         self.indexes = range(self.size)
 
+        # Territory table of the board, fetched on first use.
+        self._territories = None
+
+        # Lines of the board's rendering, computed on first use.
+        self._templates = None
+
         # Call reset() to initialize internal states.
         self.reset()
 
@@ -96,36 +107,59 @@ class Board(object):
 
     def __str__(self):
         """ Render the board with pieces in Unicode-art. """
-        lines = []
-        # Draw top line.
-        lines.append((('┬───' * self.length) + '┐').replace('┬', '┌', 1))
-        # Draw each line.
-        for y in range(self.height):
-            # Draw line with the pieces.
-            line = ''
-            for x in range(self.length):
-                piece = self.get(x, y)
-                line += '│ {} '.format(piece.symbol if piece else ' ')
-            lines.append(line + '│')
-            # Draw line separator but the last one.
-            if y < (self.height - 1):
-                lines.append(
-                    (('┼───' * self.length) + '┤').replace('┼', '├', 1))
-        # Draw bottom line.
-        lines.append((('┴───' * self.length) + '┘').replace('┴', '└', 1))
-        return '\n'.join(lines)
+        symbols = [' '] * self.size
+        for index, piece in self.squares.items():
+            symbols[index] = piece.symbol
+        return self.render(symbols)
+
+    @property
+    def templates(self):
+        """ Return top, separator and bottom lines of the board's rendering.
+
+        Lines only depends on the board's dimensions, so they're computed once
+        and reused for all renderings.
+        """
+        if self._templates is None:
+            self._templates = (
+                (('┬───' * self.length) + '┐').replace('┬', '┌', 1),
+                (('┼───' * self.length) + '┤').replace('┼', '├', 1),
+                (('┴───' * self.length) + '┘').replace('┴', '└', 1))
+        return self._templates
+
+    def render(self, symbols):
+        """ Render in Unicode-art a vector of symbols indexed linearly. """
+        top, separator, bottom = self.templates
+        length = self.length
+        rows = [
+            '│ {} │'.format(' │ '.join(symbols[start:start + length]))
+            for start in range(0, self.size, length)]
+        return '{}\n{}\n{}'.format(
+            top, '\n{}\n'.format(separator).join(rows), bottom)
+
+    def render_placement(self, population, placement):
+        """ Render in Unicode-art a placement of pieces produced by a solver.
+
+        Pieces are neither instantiated nor added to the board.
+        """
+        symbols = [' '] * self.size
+        for uid, index in zip(population, placement):
+            symbols[index] = PIECE_CLASSES[uid].symbol
+        return self.render(symbols)
 
     def reset(self):
         """ Empty board, remove all pieces and reset internal states. """
         # Store positionned pieces on the board.
         self.pieces = set()
 
-        # Squares on the board already occupied by a piece.
-        self.occupancy = self.new_vector()
+        # Map linear indexes of occupied squares to their piece.
+        self.squares = {}
 
-        # Territory susceptible to attacke, i.e. squares reachable by at least
-        # a piece.
-        self.exposed_territory = self.new_vector()
+        # Bitmask of squares on the board already occupied by a piece.
+        self.occupancy = 0
+
+        # Bitmask of territory susceptible to attacke, i.e. squares reachable
+        # by at least a piece.
+        self.exposed_territory = 0
 
     @property
     def positions(self):
@@ -134,6 +168,53 @@ class Board(object):
             for x in range(self.length):
                 yield x, y
 
+    @property
+    def territories(self):
+        """ Territory bitmasks of all pieces at all positions of the board.
+
+        The table is indexed by piece UID then by linear position, i.e.
+        ``territories[uid][index]``. It is precomputed in one go for each
+        board dimensions, so placing pieces is reduced to plain lookups.
+        """
+        if self._territories is None:
+            self._territories = self.territory_tables.get(
+                (self.length, self.height), self.compute_territories)
+        return self._territories
+
+    def compute_territories(self):
+        """ Compute territory table of all pieces at all positions. """
+        return tuple(
+            tuple(
+                self.vector_to_bitmask(klass(self, index).compute_territory())
+                for index in self.indexes)
+            for klass in PIECE_CLASSES.values())
+
+    @property
+    def symmetries(self):
+        """ All symmetries of the board, as mappings of linear indexes.
+
+        A mapping is a tuple whose items are the linear indexes of the squares
+        each square is transformed to. Rectangular boards have 4 symmetries
+        (identity, horizontal and vertical reflections and half-turn), square
+        boards 4 more (diagonal reflections and quarter-turns).
+        """
+        max_x, max_y = self.length - 1, self.height - 1
+        transforms = [
+            lambda x, y: (x, y),
+            lambda x, y: (max_x - x, y),
+            lambda x, y: (x, max_y - y),
+            lambda x, y: (max_x - x, max_y - y)]
+        if self.length == self.height:
+            transforms += [
+                lambda x, y: (y, x),
+                lambda x, y: (max_y - y, max_x - x),
+                lambda x, y: (max_y - y, x),
+                lambda x, y: (y, max_x - x)]
+        return [
+            tuple(self.coordinates_to_index(*transform(x, y))
+                  for x, y in self.positions)
+            for transform in transforms]
+
     def new_vector(self):
         """ Returns a list of boolean flags of squares indexed linearly.
 
@@ -141,6 +222,18 @@ class Board(object):
         """
         return [False] * self.size
 
+    def vector_to_bitmask(self, vector):
+        """ Convert a vector of boolean flags into its bitmask. """
+        bitmask = 0
+        for index, flag in enumerate(vector):
+            if flag:
+                bitmask |= 1 << index
+        return bitmask
+
+    def bitmask_to_vector(self, bitmask):
+        """ Convert a bitmask into a vector of boolean flags. """
+        return [bool(bitmask >> index & 1) for index in self.indexes]
+
     def validate_index(self, index):
         """ Check that a linear index of a square is within board's bounds. """
         if index < 0 or index >= self.size:
@@ -174,33 +267,33 @@ class Board(object):
 
     def add(self, piece_uid, index):
         """ Add a piece to the board at the provided linear position. """
+        position = 1 << index
+
         # Square already occupied by another piece.
-        if self.occupancy[index]:
+        if self.occupancy & position:
             raise OccupiedPosition
 
         # Square reachable by another piece.
-        if self.exposed_territory[index]:
+        if self.exposed_territory & position:
             raise VulnerablePosition
 
+        # Check if a piece can attack another one from its position.
+        territory = self.territories[piece_uid][index]
+        if self.occupancy & territory:
+            raise AttackablePiece
+
         # Create a new instance of the piece.
         klass = PIECE_CLASSES[piece_uid]
         piece = klass(self, index)
 
-        # Check if a piece can attack another one from its position.
-        territory = piece.territory
-        for i in self.indexes:
-            if self.occupancy[i] and territory[i]:
-                raise AttackablePiece
-
         # Mark the territory covered by the piece as exposed and secure its
         # position on the board.
         self.pieces.add(piece)
-        self.occupancy[index] = True
-        self.exposed_territory = list(
-            map(or_, self.exposed_territory, territory))
+        self.squares[index] = piece
+        self.occupancy |= position
+        self.exposed_territory |= territory
 
     def get(self, x, y):
         """ Return piece placed at the provided coordinates. """
-        for piece in self.pieces:
-            if (piece.x, piece.y) == (x, y):
-                return piece
+        if 0 <= x < self.length and 0 <= y < self.height:
+            return self.squares.get((y * self.length) + x)
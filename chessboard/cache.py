@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015-2017 Kevin Deldycke <kevin@deldycke.com>
+#                         and contributors.
+# All Rights Reserved.
+#
+# This program is Free Software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+
+
+""" Bounded caches of precomputed data. """
+
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals
+)
+
+import os
+import sys
+from collections import OrderedDict
+
+# Environment variable overriding the default number of entries of caches.
+CACHE_SIZE_VARIABLE = 'CHESSBOARD_CACHE_SIZE'
+
+
+def cache_size(default=16):
+    """ Return the default number of entries of caches.
+
+    Set by the ``CHESSBOARD_CACHE_SIZE`` environment variable, which is
+    inherited by worker processes.
+    """
+    value = os.environ.get(CACHE_SIZE_VARIABLE)
+    if value is None:
+        return default
+    try:
+        size = int(value)
+    except ValueError:
+        size = 0
+    if size < 1:
+        raise ValueError('{} is not a positive integer: {!r}.'.format(
+            CACHE_SIZE_VARIABLE, value))
+    return size
+
+
+def deep_getsizeof(obj, seen=None):
+    """ Approximate memory footprint of an object and all its content. """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(
+            deep_getsizeof(key, seen) + deep_getsizeof(value, seen)
+            for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_getsizeof(item, seen) for item in obj)
+    return size
+
+
+class LRUCache(object):
+    """ Cache of a bounded number of entries, evicting least recently used.
+
+    Entries are meant to be big chunks of data precomputed for a board
+    geometry. Lookups are instrumented to keep track of hits, misses and
+    evictions.
+    """
+
+    def __init__(self, max_size=None):
+        """ Initialize an empty cache holding at most ``max_size`` entries.
+
+        Defaults to the size returned by :func:`cache_size`.
+        """
+        if max_size is None:
+            max_size = cache_size()
+        assert max_size > 0
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __repr__(self):
+        """ Display all relevant object internals. """
+        return (
+            '<{}: size={}, max_size={}, hits={}, misses={}, '
+            'evictions={}>'.format(
+                self.__class__.__name__, len(self), self.max_size,
+                self.hits, self.misses, self.evictions))
+
+    def __len__(self):
+        """ Number of entries currently held by the cache. """
+        return len(self.entries)
+
+    def __contains__(self, key):
+        """ Check if an entry is cached, without affecting its recency. """
+        return key in self.entries
+
+    def get(self, key, factory):
+        """ Return the entry of ``key``, computed by ``factory`` on a miss.
+
+        The returned entry is marked as the most recently used. The least
+        recently used entries are evicted beyond the maximum size.
+        """
+        if key in self.entries:
+            self.hits += 1
+            # Move the entry to the end of the ordered dict.
+            value = self.entries.pop(key)
+        else:
+            self.misses += 1
+            value = factory()
+        self.entries[key] = value
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        return value
+
+    def clear(self):
+        """ Remove all entries and reset counters. """
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def memory_usage(self):
+        """ Approximate memory used by cached entries, in bytes. """
+        seen = set()
+        return sum(
+            deep_getsizeof(value, seen) for value in self.entries.values())
+
+    @property
+    def stats(self):
+        """ Return all counters and metrics of the cache. """
+        return OrderedDict([
+            ('size', len(self)),
+            ('max_size', self.max_size),
+            ('hits', self.hits),
+            ('misses', self.misses),
+            ('evictions', self.evictions),
+            ('memory_usage', self.memory_usage)])
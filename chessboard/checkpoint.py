@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015-2017 Kevin Deldycke <kevin@deldycke.com>
+#                         and contributors.
+# All Rights Reserved.
+#
+# This program is Free Software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+
+""" Persistence of the search progress, to resume interrupted searches. """
+
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals
+)
+
+import io
+import json
+import os
+import time
+
+# Atomic replacement of the checkpoint file. Fallback to Python 2's rename,
+# which is atomic on POSIX systems.
+replace = getattr(os, 'replace', os.rename)
+
+
+class Checkpoint(object):
+    """ Cursor of a search, periodically saved to a JSON file.
+
+    The search tree is partitioned on the position of its first piece, as
+    for parallel searches. Each partition produces its solutions in a
+    deterministic order, whatever the engine or the number of processes. So
+    the cursor is made of the partition being searched, the placement of its
+    last solution consumed, and the running count of all solutions.
+
+    A solution is accounted for once the consumer of the search asks for the
+    next one, or closes the search. Resuming continues the traversal of the
+    backtracking engines right after the cursor's placement. Other engines
+    search the current partition again, and drop its solutions up to the
+    cursor. So no solution is lost, and only those produced after the last
+    save are reported twice.
+    """
+
+    def __init__(self, path, interval=60):
+        """ Initialize an empty cursor, saved at most every ``interval``
+        seconds to ``path``. """
+        assert interval >= 0
+        self.path = path
+        self.interval = interval
+        self.last_save = time.time()
+
+        # Description of the search the cursor belongs to.
+        self.params = None
+
+        # Partition being searched.
+        self.root = 0
+        # Placement of the last solution consumed in the current partition,
+        # if any.
+        self.cursor = None
+        # Solutions produced by all partitions.
+        self.result_counter = 0
+
+        # Optional callable run before each save, to flush the output of
+        # solutions the saved cursor accounts for.
+        self.before_save = None
+
+    def __repr__(self):
+        return '<Checkpoint: path={}, root={}, cursor={}, results={}>'.format(
+            self.path, self.root, self.cursor, self.result_counter)
+
+    @classmethod
+    def load(cls, path, interval=60):
+        """ Restore a cursor from a checkpoint file. """
+        with io.open(path, 'r', encoding='utf-8') as checkpoint_file:
+            state = json.load(checkpoint_file)
+        checkpoint = cls(path, interval)
+        checkpoint.params = state['params']
+        checkpoint.root = state['root']
+        if state['cursor'] is not None:
+            checkpoint.cursor = tuple(state['cursor'])
+        checkpoint.result_counter = state['result_counter']
+        return checkpoint
+
+    def bind(self, params):
+        """ Attach the cursor to a search, described by ``params``.
+
+        Raise a :exc:`ValueError` if the cursor was produced by another
+        search.
+        """
+        if self.params is None:
+            self.params = params
+        elif self.params != params:
+            raise ValueError(
+                'Checkpoint {} belongs to another search: {}.'.format(
+                    self.path, json.dumps(self.params, sort_keys=True)))
+
+    def update(self, root, cursor, result_counter, force=False):
+        """ Move the cursor, and save it if the save interval is elapsed. """
+        self.root = root
+        self.cursor = cursor
+        self.result_counter = result_counter
+        if force or time.time() - self.last_save >= self.interval:
+            self.save()
+
+    def save(self):
+        """ Write the cursor to its file.
+
+        The file is written next to its final location then renamed, so an
+        interruption never leaves a truncated checkpoint.
+        """
+        state = {
+            'params': self.params,
+            'root': self.root,
+            'cursor': self.cursor,
+            'result_counter': self.result_counter}
+        if self.before_save is not None:
+            self.before_save()
+        temporary_path = '{}.tmp'.format(self.path)
+        with io.open(temporary_path, 'wb') as temporary:
+            temporary.write(json.dumps(state, sort_keys=True).encode('utf-8'))
+        replace(temporary_path, self.path)
+        self.last_save = time.time()
@@ -20,18 +20,64 @@
 
 from __future__ import absolute_import, division, print_function
 
+import json
 import logging
 import multiprocessing
+import os
+import signal
+import socket
+import sys
 import time
+from itertools import chain, islice
 
 import click
 import click_log
 from bprofile import BProfile
 from click.exceptions import BadParameter
 
-from chessboard.benchmark import run_scenario
-
-from . import PIECE_LABELS, Benchmark, SolverContext, __version__, logger
+from chessboard.batch import read_puzzles, solve_many
+from chessboard.benchmark import (
+    ALPHA,
+    REPETITIONS,
+    THRESHOLD,
+    WARMUPS,
+    run_scenario
+)
+from chessboard.checkpoint import Checkpoint
+from chessboard.formats import BINARY_FORMATS, ENCODERS
+from chessboard.profiling import profiled_iteration, write_profiles
+from chessboard.results import ResultCache
+from chessboard.solver import ENGINES, PIECE_ORDERS, SQUARE_ORDERS
+
+from . import (
+    PIECE_CLASSES,
+    PIECE_LABELS,
+    Benchmark,
+    Board,
+    SolverContext,
+    __version__,
+    logger
+)
+
+
+class StderrHandler(logging.Handler):
+    """ Log handler echoing all messages to stderr. """
+
+    def emit(self, record):
+        try:
+            click.echo(self.format(record), err=True)
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except Exception:
+            self.handleError(record)
+
+
+def log_to_stderr():
+    """ Redirect all log messages to stderr, to keep the standard output
+    clean for machine-readable formats. """
+    handler = StderrHandler()
+    handler.setFormatter(click_log.ColorFormatter())
+    logger.handlers = [handler]
 
 
 class PositiveInt(click.types.IntParamType):
@@ -56,6 +102,12 @@ class PositiveInt(click.types.IntParamType):
 POSITIVE_INT = PositiveInt(allow_zero=False)
 POSITIVE_OR_ZERO_INT = PositiveInt(allow_zero=True)
 
+# Base name of profiling files.
+PROFILE_PREFIX = 'solver-profile'
+
+# Number of rendered boards buffered before being written to the output.
+RENDER_BATCH_SIZE = 1000
+
 
 class Solve(click.Command):
     """ Manage the solve command. """
@@ -71,6 +123,38 @@ class Solve(click.Command):
         super(Solve, self).__init__(*args, **kwargs)
 
 
+def remote_placements(server_path, solver, symmetry, count_only, limit):
+    """ Solve the puzzle of a solver on a server, and return its placements.
+
+    The count of solutions is set as the solver's result counter.
+    """
+    # Unix domain sockets are not available on Windows.
+    from chessboard.server import SolverClient
+
+    params = solver.search_params(symmetry)
+    puzzle = params.pop('pieces')
+    puzzle.update(params, count_only=count_only)
+    if limit:
+        puzzle['limit'] = limit
+    try:
+        with SolverClient(server_path) as client:
+            result = client.solve(puzzle)
+    except (IOError, socket.error) as expt:
+        raise click.ClickException('Server at {}: {}'.format(
+            server_path, expt))
+    if 'error' in result:
+        raise click.ClickException(result['error'])
+
+    solver.result_counter = result['count']
+    # Positions are grouped by label, in the order of the population.
+    labels = [
+        PIECE_CLASSES[uid].label
+        for uid, quantity in sorted(solver.pieces.items()) if quantity]
+    return [
+        tuple(chain.from_iterable(solution[label] for label in labels))
+        for solution in result.get('solutions', [])]
+
+
 @click.group(invoke_without_command=True)
 @click_log.init(logger)
 @click_log.simple_verbosity_option(
@@ -105,11 +189,81 @@ def cli(ctx):
 @click.option(
     '-s', '--silent', is_flag=True, default=False,
     help='Do not render result boards in ASCII-art.')
+@click.option(
+    '-f', '--format', 'output_format', default='board',
+    type=click.Choice(['board'] + list(ENCODERS)),
+    help='Output format of solutions: Unicode-art boards, (uid, index) '
+    'tuples, JSON Lines or packed binary records of an unsigned byte UID and '
+    'an unsigned short index per piece. Defaults to board.')
+@click.option(
+    '-c', '--count-only', is_flag=True, default=False,
+    help='Only count solutions, without producing nor rendering them.')
+@click.option(
+    '--symmetry', type=click.Choice(['none', 'fundamental', 'expand']),
+    default='none',
+    help="Reduce search by board's symmetries, and either report one "
+    "solution per set of symmetric solutions, or expand them all. Defaults "
+    "to none.")
+@click.option(
+    '-e', '--engine', type=click.Choice(ENGINES), default='auto',
+    help='Search algorithm: backtracking on bitmasks, its variant vectorized '
+    'with NumPy, or, for populations of queens or rooks as many as rows or '
+    'columns, Dancing Links or one piece per row on bitmasks. Defaults to '
+    'auto, which picks the row by row engine when it applies and '
+    'backtracking otherwise.')
+@click.option(
+    '--piece-order', type=click.Choice(PIECE_ORDERS), default='static',
+    help='Order in which kinds of pieces are placed: statically by UID, or '
+    'dynamically by most constrained kind first. Defaults to static.')
+@click.option(
+    '--square-order', type=click.Choice(SQUARE_ORDERS), default='row-major',
+    help='Order in which squares are tried for each piece. Defaults to '
+    'row-major.')
+@click.option(
+    '--limit', type=POSITIVE_INT, metavar='N',
+    help='Stop the search after N solutions.')
+@click.option(
+    '-j', '--jobs', default=1, type=POSITIVE_INT,
+    help='Number of processes to spread the search on. Defaults to 1.')
+@click.option(
+    '--stats', is_flag=True, default=False,
+    help='Report nodes visited and pruned at each level of the search tree '
+    'of the engine, and nodes per second.')
+@click.option(
+    '--checkpoint', 'checkpoint_path', metavar='FILE',
+    type=click.Path(dir_okay=False, writable=True),
+    help='Periodically save the progress of the search to a file.')
+@click.option(
+    '--resume', 'resume_path', metavar='FILE',
+    type=click.Path(exists=True, dir_okay=False, writable=True),
+    help='Resume the search from a checkpoint file, and keep saving its '
+    'progress to it.')
+@click.option(
+    '--checkpoint-interval', default=60, type=POSITIVE_INT, metavar='SECONDS',
+    help='Minimal delay between two checkpoint saves. Defaults to 60.')
+@click.option(
+    '--cache', 'cache_path', metavar='FILE',
+    type=click.Path(dir_okay=False, writable=True),
+    help='SQLite database of results, consulted before searching and updated '
+    'after. Ignored by checkpointed searches and statistics.')
+@click.option(
+    '--server', 'server_path', metavar='SOCKET',
+    help='Solve the puzzle on the server listening on a Unix domain socket. '
+    'See the serve command.')
 @click.option(
     '-p', '--profile', is_flag=True, default=False,
-    help='Produce a profiling graph.')
+    help='Produce a profiling graph, raw pstats data and collapsed stacks '
+    'for flamegraphs.')
+@click.option(
+    '--profile-phase', type=click.Choice(['all', 'search']), default='all',
+    help='Profile the whole execution, or only the search, without '
+    'territories precomputation nor rendering. Defaults to all.')
 @click.pass_context
-def solve(ctx, length, height, silent, profile, **pieces):
+def solve(
+        ctx, length, height, silent, output_format, count_only, symmetry,
+        engine, piece_order, square_order, limit, jobs, stats,
+        checkpoint_path, resume_path, checkpoint_interval, cache_path,
+        server_path, profile, profile_phase, **pieces):
     """ Solve a puzzle constrained by board dimensions and pieces. """
     # Check that at least one piece is provided.
     if not sum(pieces.values()):
@@ -118,52 +272,316 @@ def solve(ctx, length, height, silent, profile, **pieces):
             '--{}'.format(label) for label in PIECE_LABELS])
 
     # Setup the optionnal profiler.
-    profiler = BProfile('solver-profile.png', enabled=profile)
+    profiler = BProfile(
+        '{}.png'.format(PROFILE_PREFIX), enabled=profile)
+    search_only = profile and profile_phase == 'search'
+
+    if symmetry == 'none':
+        symmetry = None
+
+    if output_format != 'board':
+        log_to_stderr()
 
-    solver = SolverContext(length, height, **pieces)
+    # The server runs its own search, with its own workers and cache.
+    if server_path and any([
+            stats, checkpoint_path, resume_path, cache_path, jobs > 1]):
+        raise BadParameter(
+            'Option not available to searches on a server.', param_hint=[
+                '--server', '--stats', '--checkpoint', '--resume', '--cache',
+                '--jobs'])
+
+    try:
+        solver = SolverContext(
+            length, height, engine=engine, collect_stats=stats,
+            piece_order=piece_order, square_order=square_order, **pieces)
+    except ValueError as expt:
+        raise BadParameter(str(expt), param_hint=[
+            '--engine', '--piece-order', '--square-order'])
     logger.info(repr(solver))
 
-    logger.info('Searching positions...')
+    checkpoint = None
+    if resume_path:
+        checkpoint = Checkpoint.load(resume_path, checkpoint_interval)
+        logger.info('Resume search after {} results.'.format(
+            checkpoint.result_counter))
+    elif checkpoint_path:
+        checkpoint = Checkpoint(checkpoint_path, checkpoint_interval)
+    if checkpoint is not None:
+        try:
+            checkpoint.bind(solver.search_params(symmetry))
+        except ValueError as expt:
+            raise BadParameter(str(expt), param_hint='--resume')
+
+    cache = None
+    if cache_path:
+        cache = ResultCache(cache_path)
+
     with profiler:
-        start = time.time()
-        for result in solver.solve():
-            if not silent:
-                click.echo(u'{}'.format(result))
+        # Pause the profiler until the search starts.
+        if search_only:
+            profiler.profiler.disable()
+
+        if server_path:
+            logger.info('Searching positions on {}...'.format(server_path))
+            start = time.time()
+            placements = remote_placements(
+                server_path, solver, symmetry, count_only, limit)
+        else:
+            logger.info('Precomputing territories...')
+            start = time.time()
+            solver.territories()
+            logger.info('Territories computed in {:.2f} seconds.'.format(
+                time.time() - start))
+
+            logger.info('Searching positions...')
+            start = time.time()
+            placements = solver.solutions(
+                symmetry=symmetry, workers=jobs, checkpoint=checkpoint,
+                cache=cache)
+            if limit:
+                placements = islice(placements, limit)
+        if search_only:
+            placements = profiled_iteration(placements, profiler.profiler)
+        # Checkpoints track solutions one by one, and counting can't stop
+        # early, so both require solutions to be enumerated. Servers count
+        # on their own.
+        if count_only and checkpoint is None and not limit and (
+                not server_path):
+            if search_only:
+                profiler.profiler.enable()
+            solver.count(symmetry=symmetry, workers=jobs, cache=cache)
+            if search_only:
+                profiler.profiler.disable()
+        elif silent or count_only:
+            for _ in placements:
+                pass
+        elif output_format == 'board':
+            # Render raw placements without instantiating pieces, and write
+            # boards to the output by batches to limit I/O calls.
+            board = Board(length, height)
+            population = solver.population
+            buffer = []
+
+            def flush():
+                """ Write all buffered boards. """
+                if buffer:
+                    click.echo(u'\n'.join(buffer))
+                    del buffer[:]
+
+            if checkpoint is not None:
+                checkpoint.before_save = flush
+            for placement in placements:
+                buffer.append(board.render_placement(population, placement))
+                if len(buffer) >= RENDER_BATCH_SIZE:
+                    flush()
+            flush()
+        else:
+            # Encode raw placements straight to the output stream.
+            encoder = ENCODERS[output_format]
+            if output_format in BINARY_FORMATS:
+                stream = click.get_binary_stream('stdout')
+            else:
+                stream = click.get_text_stream('stdout')
+            population = solver.population
+            if checkpoint is not None:
+                checkpoint.before_save = stream.flush
+            for placement in placements:
+                stream.write(encoder(population, placement))
+            stream.flush()
         processing_time = time.time() - start
 
+    if cache is not None:
+        cache.close()
+
     logger.info('{} results found in {:.2f} seconds.'.format(
         solver.result_counter, processing_time))
+    # Statistics go to stderr to not mix with machine-readable outputs.
+    if stats:
+        click.echo(solver.stats.report(processing_time), err=True)
+    logger.debug('Territory tables cache: {}'.format(', '.join(
+        '{}={}'.format(k, v)
+        for k, v in Board.territory_tables.stats.items())))
 
     if profile:
         logger.info('Execution profile saved at {}'.format(
             profiler.output_path))
+        for path in write_profiles(profiler.profiler, PROFILE_PREFIX):
+            logger.info('Execution profile saved at {}'.format(
+                os.path.abspath(path)))
+
+
+@cli.command('solve-batch', short_help='Solve many chess puzzles.')
+@click.argument(
+    'input_file', metavar='[FILE]', type=click.File('r'), default='-')
+@click.option(
+    '-c', '--count-only', is_flag=True, default=False,
+    help='Only count solutions of puzzles not setting count_only.')
+@click.option(
+    '-j', '--jobs', default=1, type=POSITIVE_INT,
+    help='Number of processes to spread puzzles on. Defaults to 1.')
+@click.option(
+    '--cache', 'cache_path', metavar='FILE',
+    type=click.Path(dir_okay=False, writable=True),
+    help='SQLite database of results, consulted before searching and updated '
+    'after.')
+def solve_batch(input_file, count_only, jobs, cache_path):
+    """ Solve puzzles read as JSON Lines from FILE or the standard input.
+
+    Each line describes a puzzle with the same keys as the solve command's
+    options, and optional id, symmetry, count_only and limit keys:
+
+    \b
+        {"id": "8-queens", "length": 8, "height": 8, "queen": 8}
+
+    Results are written as JSON Lines tagged with the id of their puzzle, as
+    soon as they are available. Puzzles without an id are tagged by their
+    line number.
+    """
+    log_to_stderr()
+    stream = click.get_text_stream('stdout')
+    for result in solve_many(
+            read_puzzles(input_file), jobs, count_only, cache_path):
+        stream.write('{}\n'.format(
+            json.dumps(result, separators=(',', ':'))))
+        stream.flush()
+
+
+@cli.command(short_help='Serve a pool of warm solvers.')
+@click.argument(
+    'socket_path', metavar='SOCKET', type=click.Path(dir_okay=False))
+@click.option(
+    '-j', '--jobs', default=1, type=POSITIVE_INT,
+    help='Number of processes solving puzzles. Defaults to 1.')
+@click.option(
+    '--cache', 'cache_path', metavar='FILE',
+    type=click.Path(dir_okay=False, writable=True),
+    help='SQLite database of results, consulted before searching and updated '
+    'after.')
+def serve(socket_path, jobs, cache_path):
+    """ Solve puzzles sent to a Unix domain socket.
+
+    Worker processes live as long as the server, and keep territory tables of
+    the board dimensions they already solved.
+
+    Clients send puzzles as JSON Lines, in the format of the solve-batch
+    command, and get a result line back per puzzle. The solve command talks
+    to the server with its --server option.
+    """
+    if not hasattr(socket, 'AF_UNIX'):
+        raise click.UsageError(
+            'Unix domain sockets are not available on this platform.')
+    # Unix domain sockets are not available on Windows.
+    from chessboard.server import SolverServer
+
+    try:
+        server = SolverServer(socket_path, jobs, cache_path)
+    except (ValueError, socket.error) as expt:
+        raise BadParameter(str(expt), param_hint='SOCKET')
+    logger.info('Listening on {} with {} workers...'.format(
+        socket_path, jobs))
+    # Shutdown cleanly when killed, as daemons usually are.
+    signal.signal(signal.SIGTERM, lambda *args: sys.exit())
+    try:
+        server.serve_forever()
+    except (KeyboardInterrupt, SystemExit):
+        logger.info('Shutting down...')
+    finally:
+        server.server_close()
 
 
 @cli.command(short_help='Benchmark the solver.')
-def benchmark():
+@click.option(
+    '--warmups', default=WARMUPS, type=POSITIVE_OR_ZERO_INT,
+    help='Number of untimed runs of each scenario. Defaults to {}.'.format(
+        WARMUPS))
+@click.option(
+    '--repetitions', default=REPETITIONS, type=POSITIVE_INT,
+    help='Number of timed runs of each scenario. Defaults to {}.'.format(
+        REPETITIONS))
+@click.option(
+    '-j', '--jobs', default=1, type=POSITIVE_INT,
+    help='Number of scenarii run concurrently, at the cost of noisier '
+    'timings. Defaults to 1.')
+@click.option(
+    '--output', 'output_path', metavar='FILE',
+    type=click.Path(dir_okay=False, writable=True),
+    help='CSV file results are appended to. Defaults to the one shipped '
+    'with the package.')
+@click.option(
+    '--baseline', 'baseline_path', metavar='FILE',
+    type=click.Path(exists=True, dir_okay=False),
+    help='CSV file of results to compare with. Only results obtained on the '
+    'same system are compared. Exits with an error on regressions.')
+@click.option(
+    '--baseline-version', metavar='VERSION',
+    help='Only compare with baseline results of this version of the solver. '
+    'Defaults to all versions.')
+@click.option(
+    '--alpha', default=ALPHA, type=float,
+    help='Significance level of regressions. Defaults to {}.'.format(ALPHA))
+@click.option(
+    '--threshold', default=THRESHOLD, type=float,
+    help='Minimal slowdown of the median time, relative to the baseline, to '
+    'report a regression. Defaults to {}.'.format(THRESHOLD))
+@click.pass_context
+def benchmark(
+        ctx, warmups, repetitions, jobs, output_path, baseline_path,
+        baseline_version, alpha, threshold):
     """ Run a benchmarking suite and measure time taken by the solver.
 
-    Each scenario is run in an isolated process, and results are appended to
-    CSV file.
+    Each scenario is run in a worker process with flushed caches, first
+    untimed to warm them up, then timed several times. Each timed run is
+    appended to a CSV file, and minimum, median and interquartile range of
+    times are reported.
+
+    Scenarii slower than in the baseline are regressions if a one-sided
+    Mann-Whitney U test finds them significantly slower, and their median
+    exceeds the threshold.
     """
-    # Use all cores but one on multi-core CPUs.
-    pool_size = multiprocessing.cpu_count() - 1
-    if pool_size < 1:
-        pool_size = 1
-
-    # Start a pool of workers. Only allow 1 task per child, to force flushing
-    # of solver's internal caches.
-    pool = multiprocessing.Pool(processes=pool_size, maxtasksperchild=1)
-    results = pool.imap_unordered(run_scenario, Benchmark.scenarii)
+    if not 0 < alpha < 1:
+        raise BadParameter('{} is not between 0 and 1.'.format(
+            alpha), param_hint='--alpha')
+    if threshold < 0:
+        raise BadParameter('{} is not positive.'.format(
+            threshold), param_hint='--threshold')
+
+    # Scenarii flush territory caches themselves, so workers can be reused.
+    pool = multiprocessing.Pool(processes=jobs)
+    results = list(pool.imap_unordered(
+        run_scenario, Benchmark.jobs(warmups, repetitions)))
     pool.close()
     pool.join()
 
+    current = Benchmark()
+    current.add(results)
+
+    # Load the baseline before saving new results, which may go to the same
+    # CSV file.
+    baseline = None
+    if baseline_path:
+        baseline = Benchmark(baseline_path)
+        baseline.load_csv()
+
     # Update CSV database with the new results.
-    benchmark = Benchmark()
+    benchmark = Benchmark(output_path)
     benchmark.load_csv()
     benchmark.add(results)
     benchmark.save_csv()
 
+    try:
+        report = current.compare(
+            baseline, alpha, threshold, baseline_version)
+    except ValueError as expt:
+        raise BadParameter(str(expt), param_hint='--baseline')
+    click.echo(report.to_string(index=False))
+
+    if baseline is not None:
+        regressions = report['regression'].sum()
+        if regressions:
+            logger.error('{} regressions found.'.format(regressions))
+            ctx.exit(1)
+        logger.info('No regression found.')
+
 
 @cli.command(short_help='Plot solver performances.')
 def graph():
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015-2017 Kevin Deldycke <kevin@deldycke.com>
+#                         and contributors.
+# All Rights Reserved.
+#
+# This program is Free Software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+
+
+""" Dancing Links implementation of Knuth's Algorithm X.
+
+Solves exact cover problems with secondary columns: primary columns must be
+covered exactly once, secondary columns at most once.
+
+See: https://arxiv.org/abs/cs/0011047
+"""
+
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals
+)
+
+from chessboard import SearchCancelled
+
+
+class DancingLinks(object):
+    """ Sparse matrix of an exact cover problem, linked in all directions.
+
+    Columns and options are referenced by their integer position. Nodes of
+    the matrix are materialized by their index in a set of flat lists, one
+    per link, for speed. Node ``0`` is the root header, nodes ``1`` to ``n``
+    are column headers, other nodes are the 1s of options.
+    """
+
+    def __init__(self, primary, secondary, options):
+        """ Link ``primary`` and ``secondary`` columns count and options.
+
+        ``options`` is an iterable of lists of column positions. Primary
+        columns are positioned first, from ``0`` to ``primary - 1``, followed
+        by secondary ones.
+        """
+        columns = primary + secondary
+        headers = columns + 1
+
+        # Horizontal links. Only primary headers are linked to the root, so
+        # secondary columns are never chosen for branching.
+        self.left = [0] * headers
+        self.right = [0] * headers
+        for node in range(primary + 1):
+            self.left[node] = node - 1 if node else primary
+            self.right[node] = node + 1 if node < primary else 0
+        for node in range(primary + 1, headers):
+            self.left[node] = self.right[node] = node
+
+        # Vertical links of headers point to themselves while column is empty.
+        self.up = list(range(headers))
+        self.down = list(range(headers))
+        self.column = list(range(headers))
+        self.size = [0] * headers
+        self.option = [None] * headers
+
+        # First node of each option.
+        self.options = []
+        for option_id, option in enumerate(options):
+            first = None
+            for column_id in option:
+                header = column_id + 1
+                node = len(self.column)
+                self.column.append(header)
+                self.option.append(option_id)
+                # Insert at the bottom of the column.
+                self.up.append(self.up[header])
+                self.down.append(header)
+                self.down[self.up[header]] = node
+                self.up[header] = node
+                self.size[header] += 1
+                # Insert at the end of the option's row.
+                if first is None:
+                    first = node
+                    self.left.append(node)
+                    self.right.append(node)
+                else:
+                    self.left.append(self.left[first])
+                    self.right.append(first)
+                    self.right[self.left[first]] = node
+                    self.left[first] = node
+            self.options.append(first)
+
+    def cover(self, header):
+        """ Remove a column and all options intersecting it. """
+        left, right, up, down = self.left, self.right, self.up, self.down
+        right[left[header]] = right[header]
+        left[right[header]] = left[header]
+        row = down[header]
+        while row != header:
+            node = right[row]
+            while node != row:
+                up[down[node]] = up[node]
+                down[up[node]] = down[node]
+                self.size[self.column[node]] -= 1
+                node = right[node]
+            row = down[row]
+
+    def uncover(self, header):
+        """ Restore a column and its options, in reverse order of cover. """
+        left, right, up, down = self.left, self.right, self.up, self.down
+        row = up[header]
+        while row != header:
+            node = left[row]
+            while node != row:
+                self.size[self.column[node]] += 1
+                up[down[node]] = node
+                down[up[node]] = node
+                node = left[node]
+            row = up[row]
+        right[left[header]] = header
+        left[right[header]] = header
+
+    def select(self, option_id):
+        """ Force an option into all solutions, by covering its columns. """
+        first = self.options[option_id]
+        self.cover(self.column[first])
+        node = self.right[first]
+        while node != first:
+            self.cover(self.column[node])
+            node = self.right[node]
+
+    def choose(self):
+        """ Return the primary column with the fewest options.
+
+        Returns ``0`` if all primary columns are covered.
+        """
+        best, best_size = 0, None
+        header = self.right[0]
+        while header:
+            if best_size is None or self.size[header] < best_size:
+                best, best_size = header, self.size[header]
+            header = self.right[header]
+        return best
+
+    def solutions(self, cancelled=None, stats=None):
+        """ Generate all solutions, as lists of option positions.
+
+        ``cancelled`` is called at each node if provided, and the search
+        raises :exc:`.SearchCancelled` as soon as it returns true.
+
+        Options selected at each level, and those leaving a primary column
+        without option, are counted in ``stats`` if provided. Options forced
+        by :meth:`select` are the first level. See :class:`.SearchStats`.
+        """
+        selected = []
+
+        def search():
+            if cancelled is not None and cancelled():
+                raise SearchCancelled()
+            header = self.choose()
+            if not header:
+                yield list(selected)
+                return
+            if stats is not None and not self.size[header]:
+                stats.prunes[len(selected)] += 1
+            self.cover(header)
+            row = self.down[header]
+            while row != header:
+                selected.append(self.option[row])
+                if stats is not None:
+                    stats.nodes[len(selected)] += 1
+                node = self.right[row]
+                while node != row:
+                    self.cover(self.column[node])
+                    node = self.right[node]
+                for solution in search():
+                    yield solution
+                node = self.left[row]
+                while node != row:
+                    self.uncover(self.column[node])
+                    node = self.left[node]
+                selected.pop()
+                row = self.down[row]
+            self.uncover(header)
+
+        return search()
+
+    def count(self):
+        """ Count all solutions without producing them. """
+
+        def search():
+            header = self.choose()
+            if not header:
+                return 1
+            solutions = 0
+            self.cover(header)
+            row = self.down[header]
+            while row != header:
+                node = self.right[row]
+                while node != row:
+                    self.cover(self.column[node])
+                    node = self.right[node]
+                solutions += search()
+                node = self.left[row]
+                while node != row:
+                    self.uncover(self.column[node])
+                    node = self.left[node]
+                row = self.down[row]
+            self.uncover(header)
+            return solutions
+
+        return search()
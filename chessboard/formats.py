@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015-2017 Kevin Deldycke <kevin@deldycke.com>
+#                         and contributors.
+# All Rights Reserved.
+#
+# This program is Free Software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+
+
+""" Machine-readable encodings of solutions.
+
+Encoders work on raw placements produced by the solver, i.e. tuples of
+linear positions aligned with the population of pieces, without going
+through a :class:`.Board`.
+"""
+
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals
+)
+
+import json
+import struct
+from collections import OrderedDict
+
+from chessboard import PIECE_CLASSES
+
+# Binary record of a single piece: its UID on an unsigned byte, followed by
+# its linear position on a little-endian unsigned short.
+PIECE_RECORD = struct.Struct(str('<BH'))
+
+
+def encode_tuples(population, placement):
+    """ Encode a solution as a line of ``(uid, index)`` tuples. """
+    return '{}\n'.format(' '.join(
+        '({}, {})'.format(uid, index)
+        for uid, index in zip(population, placement)))
+
+
+def group_by_label(population, placement):
+    """ Return linear positions of a solution grouped by piece label. """
+    pieces = OrderedDict()
+    for uid, index in zip(population, placement):
+        pieces.setdefault(PIECE_CLASSES[uid].label, []).append(index)
+    return pieces
+
+
+def encode_jsonl(population, placement):
+    """ Encode a solution as a JSON object on a single line.
+
+    Linear positions are grouped by piece label.
+    """
+    return '{}\n'.format(json.dumps(
+        group_by_label(population, placement), separators=(',', ':')))
+
+
+def encode_binary(population, placement):
+    """ Encode a solution as a packed binary record.
+
+    Records are a sequence of fixed-size piece records, so all records of a
+    puzzle have the same length and need no separator.
+    """
+    return b''.join(
+        PIECE_RECORD.pack(uid, index)
+        for uid, index in zip(population, placement))
+
+
+def decode_binary(record):
+    """ Decode a binary record into a tuple of ``(uid, index)`` pairs. """
+    return tuple(
+        PIECE_RECORD.unpack_from(record, offset)
+        for offset in range(0, len(record), PIECE_RECORD.size))
+
+
+# Map format IDs to their encoder.
+ENCODERS = OrderedDict([
+    ('tuples', encode_tuples),
+    ('jsonl', encode_jsonl),
+    ('binary', encode_binary)])
+
+# Formats producing bytes instead of text.
+BINARY_FORMATS = frozenset(['binary'])
@@ -32,6 +32,7 @@ from itertools import chain
 from operator import attrgetter
 
 from chessboard import ForbiddenCoordinates
+from chessboard.cache import LRUCache
 
 from . import PY2
 
@@ -59,7 +60,9 @@ class Piece(object):
     uid = None
 
     # Cache territory occupied by pieces at a given position for a fixed board.
-    territory_cache = {}
+    # Territories are grouped by board dimensions, and only the most recently
+    # used dimensions are kept.
+    territory_cache = LRUCache()
 
     def __init__(self, board, index):
         """ Place the piece on a board at the provided linear position. """
@@ -168,14 +171,20 @@ class Piece(object):
     @property
     def territory(self):
         """ Return the cached territory occupied by the piece. """
-        cache_key = (
-            self.board.length, self.board.height, self.uid, self.index)
-        if cache_key not in self.territory_cache:
-            vector = self.compute_territory()
-            self.territory_cache[cache_key] = vector
-        else:
-            vector = self.territory_cache[cache_key]
-        return vector
+        vectors = self.territory_cache.get(
+            (self.board.length, self.board.height), dict)
+        cache_key = (self.uid, self.index)
+        if cache_key not in vectors:
+            vectors[cache_key] = self.compute_territory()
+        return vectors[cache_key]
+
+    @property
+    def bitmask(self):
+        """ Return the territory of the piece packed as a bitmask.
+
+        Bitmasks are looked up from the board's precomputed territory table.
+        """
+        return self.board.territories[self.uid][self.index]
 
     def compute_territory(self):
         """ Compute territory reachable by the piece from its current position.
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015-2017 Kevin Deldycke <kevin@deldycke.com>
+#                         and contributors.
+# All Rights Reserved.
+#
+# This program is Free Software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+
+""" Export and scoping of execution profiles. """
+
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals
+)
+
+import io
+import os
+import pstats
+from collections import defaultdict
+
+# Time below which branches of the call graph are not reported in collapsed
+# stacks, in seconds.
+COLLAPSE_THRESHOLD = 0.000001
+
+
+def function_label(function):
+    """ Return a readable and flamegraph-safe label of a profiled function.
+
+    ``function`` is a ``(filename, line, name)`` key of :mod:`pstats`.
+    """
+    filename, line, name = function
+    # Built-ins have no source file.
+    if filename == '~':
+        label = name
+    else:
+        label = '{}:{}:{}'.format(os.path.basename(filename), line, name)
+    # Semicolons separate frames in collapsed stacks.
+    return label.replace(';', ',')
+
+
+def collapse_stacks(stats):
+    """ Convert profiling statistics to collapsed stacks.
+
+    Returns a dict of stacks, as tuples of function keys from the outermost
+    caller, mapped to the time spent in their innermost function.
+
+    Deterministic profilers only record edges between callers and callees,
+    not full stacks. So stacks are rebuilt by walking down the call graph
+    from functions without callers, and the time of a function is split
+    between its stacks pro rata of the time spent through each caller.
+    Recursive calls are folded into their first occurrence.
+    """
+    # Map functions to their callees and the cumulative time spent in each.
+    callees = defaultdict(dict)
+    for function, (_, _, _, _, callers) in stats.stats.items():
+        for caller, (_, _, _, cumulative) in callers.items():
+            callees[caller][function] = cumulative
+
+    stacks = defaultdict(float)
+
+    def walk(stack, share):
+        """ Account for ``share`` of the time of the stack's last function.
+        """
+        function = stack[-1]
+        _, _, total, cumulative, _ = stats.stats[function]
+        stacks[stack] += total * share
+        for callee, edge_time in callees[function].items():
+            if callee in stack:
+                continue
+            callee_cumulative = stats.stats[callee][3]
+            if not callee_cumulative:
+                continue
+            callee_share = edge_time * share / callee_cumulative
+            if callee_cumulative * callee_share < COLLAPSE_THRESHOLD:
+                continue
+            walk(stack + (callee, ), callee_share)
+
+    for function, (_, _, _, _, callers) in stats.stats.items():
+        if not callers:
+            walk((function, ), 1.0)
+    return stacks
+
+
+def write_profiles(profile, prefix):
+    """ Save a profile as raw :mod:`pstats` data and collapsed stacks.
+
+    Files are named after ``prefix``, with ``.pstats`` and ``.collapsed``
+    extensions. Collapsed stacks have one line per stack, made of
+    semicolon-separated frames and the time spent in microseconds, as
+    expected by flamegraph tools. Returns the paths of both files.
+    """
+    stats = pstats.Stats(profile)
+    pstats_path = '{}.pstats'.format(prefix)
+    stats.dump_stats(pstats_path)
+
+    collapsed_path = '{}.collapsed'.format(prefix)
+    with io.open(collapsed_path, 'w', encoding='utf-8') as collapsed:
+        for stack, duration in sorted(collapse_stacks(stats).items()):
+            microseconds = int(round(duration * 1000000))
+            if microseconds:
+                collapsed.write('{} {}\n'.format(
+                    ';'.join(map(function_label, stack)), microseconds))
+
+    return pstats_path, collapsed_path
+
+
+def profiled_iteration(iterable, profile):
+    """ Only profile the production of items by ``iterable``.
+
+    The profile is paused while the consumer processes each item. It is
+    toggled directly around ``next()``, without any intermediate frame to
+    pollute stacks.
+    """
+    iterator = iter(iterable)
+    while True:
+        profile.enable()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            profile.disable()
+        yield item
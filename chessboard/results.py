@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015-2017 Kevin Deldycke <kevin@deldycke.com>
+#                         and contributors.
+# All Rights Reserved.
+#
+# This program is Free Software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+
+""" Persistent cache of search results, shared between runs. """
+
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals
+)
+
+import json
+import sqlite3
+import zlib
+from array import array
+
+from chessboard import PIECE_LABELS, __version__
+from chessboard.solver import index_typecode, population_groups
+
+# Maximum number of solutions stored per entry. Larger sets of solutions
+# only get their count cached.
+MAX_SOLUTIONS = 100000
+
+
+def transpose(population, placement, length, height):
+    """ Transpose a placement from a ``length`` x ``height`` board.
+
+    Positions of pieces sharing the same UID are kept sorted.
+    """
+    transposed = [
+        (index % length) * height + index // length for index in placement]
+    result = ()
+    for start, end in population_groups(population):
+        result += tuple(sorted(transposed[start:end]))
+    return result
+
+
+class ResultCache(object):
+    """ Counts and solutions of puzzles, stored in a SQLite database.
+
+    Entries are keyed by board dimensions, piece population, symmetry mode
+    and version of the package. Engines and orders don't change the set of
+    solutions, so they are not part of the key.
+
+    Boards are normalized by transposition, so that a puzzle and its
+    transposed puzzle share the same entry: they have as many solutions, and
+    the solutions of one are the transposed solutions of the other.
+
+    Solutions are stored as a compressed array of linear positions, if there
+    is at most ``max_solutions`` of them.
+    """
+
+    def __init__(self, path, max_solutions=MAX_SOLUTIONS):
+        """ Open or create the database at ``path``. """
+        self.path = path
+        self.max_solutions = max_solutions
+        self.connection = sqlite3.connect(path, timeout=30)
+        with self.connection:
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    params TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    solutions BLOB,
+                    PRIMARY KEY (params, version))""")
+
+    def __repr__(self):
+        return '<ResultCache: path={}>'.format(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """ Close the database. """
+        self.connection.close()
+
+    @staticmethod
+    def key(solver, symmetry=None):
+        """ Return the serialized parameters of a search, and if its board
+        is transposed.
+
+        Boards are normalized to portrait orientation.
+        """
+        uids_to_labels = {uid: label for label, uid in PIECE_LABELS.items()}
+        length, height = solver.length, solver.height
+        transposed = length > height
+        if transposed:
+            length, height = height, length
+        return json.dumps({
+            'length': length,
+            'height': height,
+            'pieces': {
+                uids_to_labels[uid]: quantity
+                for uid, quantity in solver.pieces.items() if quantity},
+            'symmetry': symmetry}, sort_keys=True), transposed
+
+    def get(self, solver, symmetry=None):
+        """ Return the count and the solutions of a search, or :keyword:`None`
+        if it is not cached.
+
+        Solutions are placements aligned with the solver's population, in no
+        particular order. They are :keyword:`None` if only the count is
+        cached.
+        """
+        params, transposed = self.key(solver, symmetry)
+        row = self.connection.execute(
+            'SELECT count, solutions FROM results '
+            'WHERE params = ? AND version = ?',
+            (params, __version__)).fetchone()
+        if row is None:
+            return None
+        count, solutions = row
+        if solutions is None:
+            return count, None
+
+        population = solver.population
+        positions = array(index_typecode(solver.vector_size))
+        data = zlib.decompress(bytes(solutions))
+        # Python 2's arrays only know about strings.
+        (getattr(positions, 'frombytes', None) or positions.fromstring)(data)
+        placements = [
+            tuple(positions[start:start + len(population)])
+            for start in range(0, len(positions), len(population))]
+        if transposed:
+            placements = [
+                transpose(population, placement, solver.height, solver.length)
+                for placement in placements]
+        return count, placements
+
+    def put(self, solver, symmetry, count, placements=None):
+        """ Store the count and optionally the solutions of a search.
+
+        Solutions are only stored if there is at most :attr:`max_solutions`
+        of them. An entry with solutions is never replaced by a count alone.
+        """
+        params, transposed = self.key(solver, symmetry)
+        solutions = None
+        if placements is not None and len(placements) <= self.max_solutions:
+            population = solver.population
+            positions = array(index_typecode(solver.vector_size))
+            for placement in placements:
+                if transposed:
+                    placement = transpose(
+                        population, placement, solver.length, solver.height)
+                positions.extend(placement)
+            data = (
+                getattr(positions, 'tobytes', None) or positions.tostring)()
+            solutions = sqlite3.Binary(zlib.compress(data))
+        with self.connection:
+            self.connection.execute(
+                'INSERT OR {} INTO results '
+                '(params, version, count, solutions) '
+                'VALUES (?, ?, ?, ?)'.format(
+                    'IGNORE' if solutions is None else 'REPLACE'),
+                (params, __version__, count, solutions))
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015-2017 Kevin Deldycke <kevin@deldycke.com>
+#                         and contributors.
+# All Rights Reserved.
+#
+# This program is Free Software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+
+""" Line by line search of queens or rooks, on bitmasks of columns and
+diagonals.
+
+This is the classic algorithm of the n-queens problem. It applies to any
+population of a single kind of queens or rooks, as many as the lines of the
+board, as each line then holds exactly one piece.
+"""
+
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals
+)
+
+from chessboard import SearchCancelled
+
+
+class RowSearch(object):
+    """ Place one piece per line, tracking attacked positions as bitmasks.
+
+    Lines are the rows of the board, or its columns if ``transposed`` is
+    set. Bit ``p`` of the bitmasks of a line stands for its position ``p``.
+    Columns attacked by placed pieces are the same on all lines, while their
+    diagonals are shifted by one position at each line.
+    """
+
+    def __init__(self, length, height, diagonals, transposed=False):
+        """ Set board dimensions, and if pieces attack along diagonals. """
+        self.length = length
+        self.height = height
+        self.diagonals = diagonals
+        self.transposed = transposed
+        if transposed:
+            self.lines, self.width = length, height
+        else:
+            self.lines, self.width = height, length
+        self.full = (1 << self.width) - 1
+
+        # Solution counts, indexed by root.
+        self.counts = {}
+
+    def index(self, line, position):
+        """ Return the linear position on the board of a line's position. """
+        if self.transposed:
+            return position * self.length + line
+        return line * self.length + position
+
+    def allowed(self, root):
+        """ Return the bitmask of allowed positions of each line.
+
+        The ``root`` linear position is the lowest of all pieces: its line
+        only allows it, and other lines only allow positions beyond it.
+        """
+        x, y = root % self.length, root // self.length
+        root_line, root_position = (x, y) if self.transposed else (y, x)
+        masks = []
+        for line in range(self.lines):
+            if line == root_line:
+                masks.append(1 << root_position)
+            else:
+                masks.append(sum(
+                    1 << position for position in range(self.width)
+                    if self.index(line, position) > root))
+        return masks
+
+    def placements(self, root, cancelled=None, stats=None):
+        """ Generate sorted linear positions of solutions with ``root`` as
+        their lowest position.
+
+        ``cancelled`` is called at each node if provided, and the search
+        raises :exc:`.SearchCancelled` as soon as it returns true.
+
+        Nodes visited on each line, and those leaving no position on the next
+        line, are counted in ``stats`` if provided. See :class:`.SearchStats`.
+        """
+        allowed = self.allowed(root)
+        last_line = self.lines - 1
+        full = self.full
+        positions = [0] * self.lines
+
+        # Stacks of attacked columns, diagonals and anti-diagonals, and of
+        # positions left to explore, of the current line and above.
+        columns = [0] * self.lines
+        diagonals = [0] * self.lines
+        antidiagonals = [0] * self.lines
+        available = [0] * self.lines
+        available[0] = allowed[0]
+        line = 0
+
+        while line >= 0:
+            if cancelled is not None and cancelled():
+                raise SearchCancelled()
+
+            squares = available[line]
+            if not squares:
+                line -= 1
+                continue
+
+            # Pop the lowest position left.
+            lowest = squares & -squares
+            available[line] = squares ^ lowest
+            positions[line] = lowest.bit_length() - 1
+            if stats is not None:
+                stats.nodes[line] += 1
+
+            if line == last_line:
+                yield tuple(sorted(
+                    self.index(line, position)
+                    for line, position in enumerate(positions)))
+                continue
+
+            column = columns[line] | lowest
+            diagonal = antidiagonal = 0
+            if self.diagonals:
+                diagonal = ((diagonals[line] | lowest) << 1) & full
+                antidiagonal = (antidiagonals[line] | lowest) >> 1
+            line += 1
+            columns[line] = column
+            diagonals[line] = diagonal
+            antidiagonals[line] = antidiagonal
+            available[line] = allowed[line] & ~(
+                column | diagonal | antidiagonal)
+            if stats is not None and not available[line]:
+                stats.prunes[line - 1] += 1
+
+    def count(self, root):
+        """ Count solutions with ``root`` as their lowest position.
+
+        Pieces can't share a row, so the mirror image of a solution across
+        the vertical axis of the board has the mirror image of the root as
+        its lowest position. Both roots have as many solutions, so only one
+        of them is searched.
+        """
+        x, y = root % self.length, root // self.length
+        mirror = y * self.length + self.length - 1 - x
+        key = min(root, mirror)
+        if key not in self.counts:
+            self.counts[key] = self.count_root(key)
+        return self.counts[key]
+
+    def count_root(self, root):
+        """ Search and count solutions with ``root`` as their lowest
+        position. """
+        allowed = self.allowed(root)
+        last_line = self.lines - 1
+        full = self.full
+        diagonals = self.diagonals
+
+        def count_line(line, column, diagonal, antidiagonal):
+            """ Count solutions below a line. """
+            squares = allowed[line] & ~(column | diagonal | antidiagonal)
+            # All positions left on the last line are solutions.
+            if line == last_line:
+                return bin(squares).count('1')
+            solutions = 0
+            while squares:
+                lowest = squares & -squares
+                squares ^= lowest
+                if diagonals:
+                    solutions += count_line(
+                        line + 1, column | lowest,
+                        ((diagonal | lowest) << 1) & full,
+                        (antidiagonal | lowest) >> 1)
+                else:
+                    solutions += count_line(line + 1, column | lowest, 0, 0)
+            return solutions
+
+        return count_line(0, 0, 0, 0)
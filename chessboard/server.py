@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015-2017 Kevin Deldycke <kevin@deldycke.com>
+#                         and contributors.
+# All Rights Reserved.
+#
+# This program is Free Software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+
+""" Long-lived solver daemon, listening on a Unix domain socket.
+
+The protocol is JSON Lines: clients send puzzles, one per line, and get one
+result line back per puzzle, in the same order. Puzzles and results are
+those of batches, see :mod:`chessboard.batch`.
+"""
+
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals
+)
+
+import errno
+import json
+import multiprocessing
+import os
+import socket
+import stat
+
+from chessboard import logger
+from chessboard.batch import init_worker, read_puzzles, solve_task
+
+try:
+    import socketserver
+# Fallback to Python 2's module name.
+except ImportError:
+    import SocketServer as socketserver
+
+
+def encode(data):
+    """ Serialize an object to a line of JSON. """
+    return '{}\n'.format(
+        json.dumps(data, separators=(',', ':'))).encode('utf-8')
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    """ Answer all puzzles sent through a connection. """
+
+    def handle(self):
+        """ Parse puzzles as batches do, and answer them as they come.
+
+        Puzzles without an ``id``, and malformed lines, are tagged by their
+        line number in the connection. See :func:`.read_puzzles`.
+        """
+        for puzzle in read_puzzles(iter(self.rfile.readline, b'')):
+            if 'error' in puzzle:
+                result = puzzle
+            else:
+                logger.debug('Solve {!r}'.format(puzzle))
+                result = self.server.solve(puzzle)
+            self.wfile.write(encode(result))
+            self.wfile.flush()
+
+
+class SolverServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """ Serve puzzles to a pool of worker processes.
+
+    Each connection is handled in its own thread, while puzzles are solved
+    by ``workers`` processes living as long as the server. So workers keep
+    territory tables of the board dimensions they already met, and their
+    own connection to the result cache at ``cache_path``, if provided.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path, workers=1, cache_path=None):
+        """ Start workers and listen on the socket at ``path``. """
+        self.path = path
+        self.remove_stale_socket()
+        self.pool = multiprocessing.Pool(
+            processes=workers, initializer=init_worker,
+            initargs=(cache_path, ))
+        try:
+            socketserver.UnixStreamServer.__init__(
+                self, path, RequestHandler)
+        except Exception:
+            self.pool.terminate()
+            raise
+
+    def remove_stale_socket(self):
+        """ Remove the socket left by a dead server.
+
+        Raise an error if a server is still listening on it, or if the path
+        is not a socket.
+        """
+        if not os.path.exists(self.path):
+            return
+        if not stat.S_ISSOCK(os.stat(self.path).st_mode):
+            raise ValueError('{} is not a socket.'.format(self.path))
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.path)
+        except socket.error as expt:
+            if expt.errno != errno.ECONNREFUSED:
+                raise
+            os.remove(self.path)
+        else:
+            raise ValueError('A server already listens on {}.'.format(
+                self.path))
+        finally:
+            probe.close()
+
+    def solve(self, puzzle):
+        """ Solve a puzzle in a worker and return its result. """
+        return self.pool.apply(solve_task, ((puzzle, False), ))
+
+    def server_close(self):
+        """ Stop workers and remove the socket. """
+        socketserver.UnixStreamServer.server_close(self)
+        self.pool.terminate()
+        self.pool.join()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class SolverClient(object):
+    """ Connection to a :class:`SolverServer`. """
+
+    def __init__(self, path):
+        """ Connect to the server listening on ``path``. """
+        self.path = path
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.connect(path)
+        self.stream = self.socket.makefile('rwb')
+
+    def __repr__(self):
+        return '<SolverClient: path={}>'.format(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """ Close the connection. """
+        self.stream.close()
+        self.socket.close()
+
+    def solve(self, puzzle):
+        """ Send a puzzle to the server and return its result. """
+        self.stream.write(encode(puzzle))
+        self.stream.flush()
+        line = self.stream.readline()
+        if not line:
+            raise IOError('Connection closed by the server.')
+        return json.loads(line.decode('utf-8'))
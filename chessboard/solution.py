@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015-2017 Kevin Deldycke <kevin@deldycke.com>
+#                         and contributors.
+# All Rights Reserved.
+#
+# This program is Free Software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+
+""" Immutable snapshots of solutions found by the solver. """
+
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals
+)
+
+from chessboard import Board
+
+
+class Solution(object):
+    """ Immutable and lightweight snapshot of a solution.
+
+    A solution only keeps the geometry of the board, the population of pieces
+    and their linear positions. The population is a tuple of UIDs shared by
+    all solutions of a solver, so each retained solution only costs a small
+    slotted object and a tuple of integers.
+
+    Boards and renderings are built on demand.
+    """
+
+    __slots__ = ('length', 'height', 'population', 'placement')
+
+    def __init__(self, length, height, population, placement):
+        assert len(population) == len(placement)
+        # Bypass our own read-only guard.
+        object.__setattr__(self, 'length', length)
+        object.__setattr__(self, 'height', height)
+        object.__setattr__(self, 'population', tuple(population))
+        object.__setattr__(self, 'placement', tuple(placement))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Solution is immutable.")
+
+    def __delattr__(self, name):
+        raise AttributeError("Solution is immutable.")
+
+    def __reduce__(self):
+        """ Support pickling of slotted instances, e.g. between processes. """
+        return (self.__class__, (
+            self.length, self.height, self.population, self.placement))
+
+    @property
+    def key(self):
+        """ Identity of the solution, used for comparison and hashing. """
+        return (self.length, self.height, self.positions)
+
+    def __eq__(self, other):
+        if not isinstance(other, Solution):
+            return NotImplemented
+        return self.key == other.key
+
+    def __ne__(self, other):
+        if not isinstance(other, Solution):
+            return NotImplemented
+        return self.key != other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return '<Solution: length={}, height={}, positions={}>'.format(
+            self.length, self.height, self.positions)
+
+    def __str__(self):
+        """ Render the solution in Unicode-art. """
+        return Board(self.length, self.height).render_placement(
+            self.population, self.placement)
+
+    @property
+    def positions(self):
+        """ Return the solution as a tuple of ``(uid, index)`` pairs. """
+        return tuple(zip(self.population, self.placement))
+
+    @property
+    def board(self):
+        """ Return a new board with all pieces of the solution.
+
+        The board is created on each call and belongs to the caller.
+        """
+        board = Board(self.length, self.height)
+        for uid, index in self.positions:
+            board.add(uid, index)
+        return board
+
+    @property
+    def pieces(self):
+        """ Return pieces of the solution, positioned on a new board. """
+        return self.board.pieces
@@ -27,15 +27,55 @@ from __future__ import (
     unicode_literals
 )
 
+import multiprocessing
+import threading
+from array import array
 from itertools import chain
 
-from chessboard import (
-    PIECE_LABELS,
-    AttackablePiece,
-    Board,
-    OccupiedPosition,
-    VulnerablePosition
-)
+import numpy
+
+from chessboard import PIECE_LABELS, Board, Queen, Rook, SearchCancelled
+from chessboard.dlx import DancingLinks
+from chessboard.rows import RowSearch
+from chessboard.solution import Solution
+from chessboard.stats import SearchStats
+
+# Ways of handling board's symmetries while searching for solutions.
+SYMMETRY_MODES = (None, 'fundamental', 'expand')
+
+# Algorithms available to search for solutions.
+ENGINES = ('auto', 'backtracking', 'numpy', 'dlx', 'rows')
+
+# Human-readable names of specialized engines.
+ENGINE_NAMES = {'dlx': 'Dancing Links', 'rows': 'Row by row'}
+
+# Orders in which kinds of pieces are placed while searching.
+PIECE_ORDERS = ('static', 'dynamic')
+
+# Orders in which squares are tried for each piece.
+SQUARE_ORDERS = (
+    'row-major', 'center-out', 'edges-first', 'least-constraining')
+
+# Unsigned array types able to store linear positions, from the most compact.
+# Python 2's arrays only accept byte strings as type codes.
+INDEX_TYPECODES = tuple(str(typecode) for typecode in ('B', 'H', 'L'))
+
+
+def index_typecode(highest):
+    """ Return the most compact unsigned array type holding ``highest``. """
+    for typecode in INDEX_TYPECODES:
+        if highest < 256 ** array(typecode).itemsize:
+            return typecode
+    raise ValueError('No array type can hold {}.'.format(highest))
+
+
+def population_groups(population):
+    """ Return ``(start, end)`` boundaries of consecutive levels of a
+    population sharing the same UID, i.e. of interchangeable pieces. """
+    bounds = [
+        level for level in range(1, len(population))
+        if population[level] != population[level - 1]]
+    return list(zip([0] + bounds, bounds + [len(population)]))
 
 
 class Permutations(object):
@@ -55,16 +95,18 @@ class Permutations(object):
 
         # Range of permutations.
         self.range_size = range_size if range_size else self.depth
-        # Because we're using bytearray to store permutations states, we can't
-        # keep track of pieces above the 255 position.
-        assert self.range_size < 256
+
+        # Store permutations states in the most compact array able to hold
+        # positions, including the one overflowing the range on increment.
+        self.typecode = index_typecode(self.range_size)
 
         # Keep track of our current progression in search space. This variable
         # always holds the last permutation we returned.
         self.indexes = None
 
         # Compute the terminal iteration the generator may reach.
-        self.terminal_iteration = bytearray([self.range_size - 1] * self.depth)
+        self.terminal_iteration = array(
+            self.typecode, [self.range_size - 1] * self.depth)
 
     def increment(self):
         """ Increment the last permutation we returned to the next. """
@@ -98,7 +140,7 @@ class Permutations(object):
         Raise iteration exception when we explored all permutations.
         """
         if self.indexes is None:
-            self.indexes = bytearray(self.depth)
+            self.indexes = array(self.typecode, [0] * self.depth)
         elif self.indexes == self.terminal_iteration:
             raise StopIteration
         else:
@@ -119,14 +161,653 @@ class Permutations(object):
             self.indexes[i] = self.range_size - 1
 
 
+def popcount(bitmask):
+    """ Return the number of bits set in a bitmask. """
+    return bin(bitmask).count('1')
+
+
+def skip_through(placements, after):
+    """ Generate placements produced after the ``after`` placement.
+
+    Placements up to ``after`` are regenerated and dropped, for searches
+    which can't resume from a placement.
+    """
+    placements = iter(placements)
+    for placement in placements:
+        if placement == after:
+            break
+    for placement in placements:
+        yield placement
+
+
+class SearchTree(object):
+    """ Depth-first, backtracking traversal of the search tree.
+
+    Each level of the tree is the placement of one piece. Going down the tree
+    adds a single piece to the bitmasks of the current node, and going back up
+    only drops the deepest one, so the placement of upper levels is never
+    replayed.
+
+    Nodes hold the bitmask of squares still safe for each kind of piece, i.e.
+    squares neither occupied, nor exposed, nor from which a piece of that kind
+    could attack an already placed one. So the search only iterates over
+    valid positions, and prune branches as soon as safe squares are too few to
+    hold the remaining pieces.
+    """
+
+    # Placements are the path to their leaf, so the traversal can resume
+    # right after any of them. See :meth:`placements`.
+    resumable = True
+
+    def __init__(self, context, symmetric=False, roots=None):
+        """ Precompute the layout of the tree for a solver context.
+
+        If ``symmetric`` is set, only a subset of the tree containing at least
+        all canonical placements is explored. See
+        :meth:`SolverContext.canonical_search`.
+
+        ``roots`` restricts the linear positions of the first level to explore,
+        to only search a subset of the tree.
+        """
+        self.pieces = context.population
+        self.depth = len(self.pieces)
+        self.size = context.vector_size
+        self.cancelled = context.cancelled
+        territories = context.territories()
+
+        # Bitmask of all squares of the board.
+        self.full = (1 << self.size) - 1
+
+        # Kinds of pieces are the distinct UIDs of the population, with their
+        # territory table.
+        self.kinds = sorted(set(self.pieces))
+        self.kind_of = [self.kinds.index(uid) for uid in self.pieces]
+        self.tables = [territories[uid] for uid in self.kinds]
+
+        # Pieces sharing the same UID are interchangeable, so we only explore
+        # positions beyond their parent's to deduplicate permutations. See #7.
+        self.same_uid = [
+            level > 0 and self.pieces[level] == self.pieces[level - 1]
+            for level in range(self.depth)]
+
+        # Number of pieces of each kind left to place below each level.
+        self.remaining = []
+        for level in range(self.depth):
+            below = self.kind_of[level + 1:]
+            self.remaining.append([
+                (kind, below.count(kind)) for kind in sorted(set(below))])
+
+        # Linear positions allowed for the first level.
+        self.roots = self.full
+        if roots is not None:
+            self.roots = 0
+            for index in roots:
+                self.roots |= 1 << index
+
+        # Pieces sharing the UID of the first level can't be placed on a
+        # square which a symmetry maps before the first piece. Floor masks
+        # are indexed by the position of the first piece.
+        self.constrained = [False] * self.depth
+        self.floor_masks = None
+        if symmetric:
+            orbit_floor = context.orbit_floor()
+            self.constrained = [
+                kind == self.kind_of[0] for kind in self.kind_of]
+            squares_by_floor = [0] * (self.size + 1)
+            for index, floor in enumerate(orbit_floor):
+                squares_by_floor[floor] |= 1 << index
+            self.floor_masks = [0] * (self.size + 1)
+            for floor in reversed(range(self.size)):
+                self.floor_masks[floor] = (
+                    self.floor_masks[floor + 1] | squares_by_floor[floor])
+            # The first piece lies on the lowest square of its orbit.
+            self.roots &= sum(
+                1 << index for index, floor in enumerate(orbit_floor)
+                if floor == index)
+
+    def initial_safe(self):
+        """ Safe squares of all kinds of an empty board. """
+        return [self.full] * len(self.kinds)
+
+    def place_kind(self, kind, index, safe):
+        """ Return safe squares of each kind once a piece of a kind is
+        placed. """
+        territory = self.tables[kind][index]
+        return [
+            squares & ~(territory | table[index])
+            for squares, table in zip(safe, self.tables)]
+
+    def place(self, level, index, safe):
+        """ Return safe squares of each kind once a level's piece is placed.
+        """
+        return self.place_kind(self.kind_of[level], index, safe)
+
+    def feasible(self, level, index, safe):
+        """ Check remaining pieces can still fit in the safe squares. """
+        kind_of_level = self.kind_of[level]
+        for kind, needed in self.remaining[level]:
+            squares = safe[kind]
+            # Interchangeable pieces are only placed beyond their parent.
+            if kind == kind_of_level:
+                squares >>= index + 1
+            if popcount(squares) < needed:
+                return False
+        return True
+
+    def candidates(self, level, safe, path):
+        """ Return the bitmask of positions to explore at a level. """
+        squares = safe[self.kind_of[level]]
+        if not level:
+            return squares & self.roots
+        if self.same_uid[level]:
+            squares &= ~((2 << path[level - 1]) - 1)
+        if self.constrained[level]:
+            squares &= self.floor_masks[path[0]]
+        return squares
+
+    def positions(self, level, candidates, after=None):
+        """ Iterate over the candidates of a level, in the order to explore
+        them, only beyond the ``after`` position if provided. """
+        if after is not None:
+            # Negative powers of two mask all bits above their own.
+            candidates &= -(2 << after)
+        while candidates:
+            # Pop the lowest position left.
+            lowest = candidates & -candidates
+            candidates ^= lowest
+            yield lowest.bit_length() - 1
+
+    def child(self, level, index, safe, path):
+        """ Return safe squares and candidates of the node below a placed
+        piece, or :keyword:`None` if remaining pieces can't fit. """
+        safe = self.place(level, index, safe)
+        if not self.feasible(level, index, safe):
+            return None
+        return safe, self.candidates(level + 1, safe, path)
+
+    def backtrack(self, level):
+        """ Called once all positions of a level have been explored. """
+
+    def placement(self, path):
+        """ Return the placement of the solution at the end of a path. """
+        return tuple(path)
+
+    def placements(self, after=None):
+        """ Generate placements of all solutions of the tree.
+
+        Placements are tuples of linear positions, indexed by level. If
+        ``after`` is provided, the traversal of a :attr:`resumable` tree
+        resumes right after this placement, previously produced by the tree.
+
+        This traversal is shared by all trees, which only customize how
+        positions of a level are iterated over, with :meth:`positions`, and
+        how a node is expanded, with :meth:`child`.
+
+        The cancellation of the context is checked at each node. See
+        :attr:`SolverContext.cancelled`.
+        """
+        last_level = self.depth - 1
+        path = [0] * self.depth
+
+        # Stacks of the safe squares and of positions left to explore, of the
+        # current node and its ancestors.
+        safes = [None] * self.depth
+        safes[0] = self.initial_safe()
+        iterators = [None] * self.depth
+        iterators[0] = self.positions(0, self.candidates(0, safes[0], path))
+        level = 0
+
+        # Rebuild the stacks along the path to the placement, with only
+        # positions beyond its own left to explore at each level.
+        if after is not None:
+            path[:] = after
+            for level in range(self.depth):
+                iterators[level] = self.positions(
+                    level, self.candidates(level, safes[level], path),
+                    after=path[level])
+                if level < last_level:
+                    safes[level + 1] = self.place(
+                        level, path[level], safes[level])
+            level = last_level
+
+        # Hooks are looked up once, out of the hot loop.
+        positions, child, backtrack, placement = (
+            self.positions, self.child, self.backtrack, self.placement)
+        cancelled = self.cancelled
+
+        while level >= 0:
+            if cancelled is not None and cancelled():
+                raise SearchCancelled()
+
+            for index in iterators[level]:
+                break
+            # All positions of this level have been explored: proceed to the
+            # next sibling of the upper level.
+            else:
+                backtrack(level)
+                level -= 1
+                continue
+
+            path[level] = index
+
+            # All pieces fits, save solution and proceeed to the next sibling.
+            if level == last_level:
+                yield placement(path)
+                continue
+
+            # Go one level deeper, unless remaining pieces can't fit.
+            node = child(level, index, safes[level], path)
+            if node is None:
+                continue
+            level += 1
+            safes[level], candidates = node
+            iterators[level] = positions(level, candidates)
+
+    def count(self):
+        """ Count solutions of the tree without materializing them. """
+        last_level = self.depth - 1
+        path = [0] * self.depth
+
+        def count_level(level, squares, safe):
+            """ Count solutions below a node of the search tree. """
+            # All positions left at the last level are solutions.
+            if level == last_level:
+                return popcount(squares)
+            solutions = 0
+            while squares:
+                lowest = squares & -squares
+                squares ^= lowest
+                index = lowest.bit_length() - 1
+                path[level] = index
+                child_safe = self.place(level, index, safe)
+                if not self.feasible(level, index, child_safe):
+                    continue
+                solutions += count_level(
+                    level + 1,
+                    self.candidates(level + 1, child_safe, path),
+                    child_safe)
+            return solutions
+
+        safe = self.initial_safe()
+        return count_level(0, self.candidates(0, safe, path), safe)
+
+
+class VectorizedSearchTree(SearchTree):
+    """ Same traversal as :class:`SearchTree`, but on NumPy arrays.
+
+    Territories of each kind of pieces are stored as a 2D boolean matrix,
+    indexed by ``[index, square]``. Safe squares of all kinds are evaluated in
+    a single vectorized operation at each placement, and candidates of the
+    next level are extracted from them without any Python-level loop.
+    """
+
+    def __init__(self, context, symmetric=False, roots=None):
+        """ Convert bitmasks of the tree's layout to boolean arrays. """
+        super(VectorizedSearchTree, self).__init__(context, symmetric, roots)
+        board = Board(context.length, context.height)
+
+        # Territories, indexed by ``[kind, index, square]``.
+        self.matrix = numpy.array([
+            [board.bitmask_to_vector(territory) for territory in table]
+            for table in self.tables], dtype=bool)
+
+        self.roots_vector = numpy.array(
+            board.bitmask_to_vector(self.roots), dtype=bool)
+        if symmetric:
+            self.floor_vectors = numpy.array([
+                board.bitmask_to_vector(floor_mask)
+                for floor_mask in self.floor_masks], dtype=bool)
+
+    def initial_safe(self):
+        """ Safe squares of all kinds of an empty board. """
+        return numpy.ones((len(self.kinds), self.size), dtype=bool)
+
+    def place_kind(self, kind, index, safe):
+        """ Return safe squares of each kind once a piece of a kind is
+        placed. """
+        return safe & ~(self.matrix[kind, index] | self.matrix[:, index])
+
+    def feasible(self, level, index, safe):
+        """ Check remaining pieces can still fit in the safe squares. """
+        kind_of_level = self.kind_of[level]
+        for kind, needed in self.remaining[level]:
+            squares = safe[kind]
+            # Interchangeable pieces are only placed beyond their parent.
+            if kind == kind_of_level:
+                squares = squares[index + 1:]
+            if numpy.count_nonzero(squares) < needed:
+                return False
+        return True
+
+    def candidates(self, level, safe, path):
+        """ Return the sorted list of positions to explore at a level. """
+        squares = safe[self.kind_of[level]]
+        if not level:
+            squares = squares & self.roots_vector
+        else:
+            if self.constrained[level]:
+                squares = squares & self.floor_vectors[path[0]]
+            if self.same_uid[level]:
+                squares = squares.copy()
+                squares[:path[level - 1] + 1] = False
+        return numpy.flatnonzero(squares).tolist()
+
+    def positions(self, level, candidates, after=None):
+        """ Iterate over the sorted candidates of a level, only beyond the
+        ``after`` position if provided. """
+        if after is None:
+            return iter(candidates)
+        return iter([index for index in candidates if index > after])
+
+    def count(self):
+        """ Count solutions of the tree without materializing them. """
+        last_level = self.depth - 1
+        path = [0] * self.depth
+
+        def count_level(level, positions, safe):
+            """ Count solutions below a node of the search tree. """
+            # All positions left at the last level are solutions.
+            if level == last_level:
+                return len(positions)
+            solutions = 0
+            for index in positions:
+                path[level] = index
+                child_safe = self.place(level, index, safe)
+                if not self.feasible(level, index, child_safe):
+                    continue
+                solutions += count_level(
+                    level + 1,
+                    self.candidates(level + 1, child_safe, path),
+                    child_safe)
+            return solutions
+
+        safe = self.initial_safe()
+        return count_level(0, self.candidates(0, safe, path), safe)
+
+
+class OrderedSearchTree(SearchTree):
+    """ Search tree trying squares of each kind of pieces in a custom order.
+
+    Squares are tried in the order of :meth:`SolverContext.square_sequence`
+    instead of their linear position. Interchangeable pieces are placed
+    beyond their sibling in that order, so each solution is still produced
+    once. Positions of interchangeable pieces are sorted back before being
+    produced, so placements are the same as with the linear order.
+
+    Symmetric restrictions of the tree rely on the linear order, so the
+    whole tree is searched, and only the canonical filter of
+    :meth:`SolverContext.canonical_search` applies.
+    """
+
+    # Placements are sorted back to the linear order, so they don't retrace
+    # the traversal.
+    resumable = False
+
+    def __init__(self, context, symmetric=False, roots=None):
+        """ Precompute squares ranked after each square, for all kinds. """
+        super(OrderedSearchTree, self).__init__(context, False, roots)
+
+        # Squares of each kind of pieces, in the order they are tried.
+        self.sequences = [
+            context.square_sequence(uid) for uid in self.kinds]
+
+        # Bitmask of squares ranked after each square, by kind.
+        self.after = []
+        for sequence in self.sequences:
+            after = [0] * self.size
+            squares = 0
+            for index in reversed(sequence):
+                after[index] = squares
+                squares |= 1 << index
+            self.after.append(after)
+
+        self.groups = population_groups(self.pieces)
+
+    def feasible(self, level, index, safe):
+        """ Check remaining pieces can still fit in the safe squares. """
+        kind_of_level = self.kind_of[level]
+        for kind, needed in self.remaining[level]:
+            squares = safe[kind]
+            # Interchangeable pieces are only placed beyond their parent.
+            if kind == kind_of_level:
+                squares &= self.after[kind][index]
+            if popcount(squares) < needed:
+                return False
+        return True
+
+    def candidates(self, level, safe, path):
+        """ Return the bitmask of positions to explore at a level. """
+        squares = safe[self.kind_of[level]]
+        if not level:
+            return squares & self.roots
+        if self.same_uid[level]:
+            squares &= self.after[self.kind_of[level]][path[level - 1]]
+        return squares
+
+    def positions(self, level, candidates, after=None):
+        """ Iterate over the candidates of a level in the level's order.
+
+        Placements don't retrace this order, so the traversal can't resume
+        from one, and ``after`` is not supported.
+        """
+        assert after is None
+        return iter([
+            index for index in self.sequences[self.kind_of[level]]
+            if candidates >> index & 1])
+
+    def placement(self, path):
+        """ Return the placement of a solution, with positions of
+        interchangeable pieces sorted. """
+        return tuple(chain.from_iterable(
+            sorted(path[start:end]) for start, end in self.groups))
+
+
+class DynamicSearchTree(SearchTree):
+    """ Search tree placing the most constrained kind of pieces first.
+
+    The first level still places the first piece of the population, as it
+    partitions the tree. Below, each node picks the kind of pieces with the
+    fewest safe squares left, ties being broken by the static order of
+    kinds. This fail-first heuristic detects dead branches earlier on mixed
+    populations.
+
+    The next piece of a kind is always the lowest of its remaining pieces,
+    so it is placed beyond the previous piece of its kind, and each solution
+    is still produced once. Placements are reordered by kind before being
+    produced, to stay aligned with the population.
+    """
+
+    # Placements are reordered by kind, so they don't retrace the traversal.
+    resumable = False
+
+    def __init__(self, context, symmetric=False, roots=None):
+        """ Count pieces of each kind to place. """
+        super(DynamicSearchTree, self).__init__(context, symmetric, roots)
+        self.counts = [
+            self.kind_of.count(kind) for kind in range(len(self.kinds))]
+
+    def choose(self, safe, starts, left, root):
+        """ Return the most constrained kind of pieces and its candidates.
+
+        Candidates are null if a kind of pieces can't fit in its safe squares
+        anymore.
+        """
+        best_kind = best_squares = best_count = None
+        for kind, needed in enumerate(left):
+            if not needed:
+                continue
+            # Interchangeable pieces are only placed beyond their sibling.
+            # Negative powers of two mask all bits above their own.
+            squares = safe[kind] & -(1 << starts[kind])
+            if self.floor_masks is not None and kind == self.kind_of[0]:
+                squares &= self.floor_masks[root]
+            count = popcount(squares)
+            if count < needed:
+                return kind, 0
+            if best_count is None or count < best_count:
+                best_kind, best_squares, best_count = kind, squares, count
+        return best_kind, best_squares
+
+    def child(self, level, index, safe, path):
+        """ Return safe squares and candidates of the node below a placed
+        piece, which places the most constrained kind of pieces. """
+        kind = self.level_kinds[level]
+        self.starts[kind] = index + 1
+        safe = self.place_kind(kind, index, safe)
+        child_kind, squares = self.choose(
+            safe, self.starts, self.left, path[0])
+        if not squares:
+            return None
+        self.level_kinds[level + 1] = child_kind
+        self.saved_starts[level + 1] = self.starts[child_kind]
+        self.left[child_kind] -= 1
+        return safe, squares
+
+    def backtrack(self, level):
+        """ Give the piece of an explored level back. """
+        kind = self.level_kinds[level]
+        self.starts[kind] = self.saved_starts[level]
+        self.left[kind] += 1
+
+    def placement(self, path):
+        """ Return the placement of a solution, ordered by kind. """
+        return tuple(
+            position for _, position in sorted(zip(self.level_kinds, path)))
+
+    def placements(self, after=None):
+        """ Generate placements of all solutions of the tree.
+
+        Kinds of pieces placed at each level depend on the traversal, so its
+        state is held by the tree, which only supports one traversal at a
+        time.
+        """
+        assert after is None
+        first_kind = self.kind_of[0]
+
+        # Pieces of each kind left to place, and lowest position allowed to
+        # the next one.
+        self.left = list(self.counts)
+        self.left[first_kind] -= 1
+        self.starts = [0] * len(self.kinds)
+
+        # Stacks of the kind, and of the lowest position allowed to the kind,
+        # of the current node and its ancestors.
+        self.level_kinds = [first_kind] * self.depth
+        self.saved_starts = [0] * self.depth
+
+        return super(DynamicSearchTree, self).placements()
+
+    def count(self):
+        """ Count solutions of the tree without materializing them. """
+        last_level = self.depth - 1
+        left = list(self.counts)
+        starts = [0] * len(self.kinds)
+        path = [0] * self.depth
+
+        def count_level(level, kind, squares, safe):
+            """ Count solutions below a node of the search tree. """
+            # All positions left at the last level are solutions.
+            if level == last_level:
+                return popcount(squares)
+            left[kind] -= 1
+            saved_start = starts[kind]
+            solutions = 0
+            while squares:
+                lowest = squares & -squares
+                squares ^= lowest
+                index = lowest.bit_length() - 1
+                path[level] = index
+                starts[kind] = index + 1
+                child_safe = self.place_kind(kind, index, safe)
+                child_kind, child_squares = self.choose(
+                    child_safe, starts, left, path[0])
+                if child_squares:
+                    solutions += count_level(
+                        level + 1, child_kind, child_squares, child_safe)
+            starts[kind] = saved_start
+            left[kind] += 1
+            return solutions
+
+        safe = self.initial_safe()
+        return count_level(
+            0, self.kind_of[0], self.candidates(0, safe, path), safe)
+
+
+class InstrumentedSearch(object):
+    """ Mixin counting the work of a search tree in a :class:`.SearchStats`.
+
+    Counters are updated by the hooks of the traversal, so its code is left
+    untouched, and non-instrumented searches pay nothing.
+    """
+
+    def __init__(self, context, symmetric=False, roots=None, stats=None):
+        """ Attach the statistics to fill while searching. """
+        super(InstrumentedSearch, self).__init__(context, symmetric, roots)
+        assert stats is not None
+        self.stats = stats
+
+    def positions(self, level, candidates, after=None):
+        """ Count positions of a level as they are visited. """
+        nodes = self.stats.nodes
+        for index in super(InstrumentedSearch, self).positions(
+                level, candidates, after):
+            nodes[level] += 1
+            yield index
+
+    def child(self, level, index, safe, path):
+        """ Count placements pruned by forward checking. """
+        node = super(InstrumentedSearch, self).child(level, index, safe, path)
+        if node is None:
+            self.stats.prunes[level] += 1
+        return node
+
+
+class InstrumentedSearchTree(InstrumentedSearch, SearchTree):
+    """ :class:`SearchTree` collecting statistics. """
+
+
+class InstrumentedVectorizedSearchTree(
+        InstrumentedSearch, VectorizedSearchTree):
+    """ :class:`VectorizedSearchTree` collecting statistics. """
+
+
+class InstrumentedOrderedSearchTree(InstrumentedSearch, OrderedSearchTree):
+    """ :class:`OrderedSearchTree` collecting statistics. """
+
+
+class InstrumentedDynamicSearchTree(InstrumentedSearch, DynamicSearchTree):
+    """ :class:`DynamicSearchTree` collecting statistics. """
+
+
 class SolverContext(object):
     """ Initialize a chessboard context and search for all possible positions.
 
     The search space is constrained by board dimensions and piece population.
     """
 
-    def __init__(self, length, height, **pieces):
-        """ Initialize board dimensions and piece population."""
+    def __init__(
+            self, length, height, engine='auto', collect_stats=False,
+            piece_order='static', square_order='row-major', **pieces):
+        """ Initialize board dimensions, piece population and search engine.
+
+        ``engine`` is either ``backtracking`` for the generic search on
+        bitmasks, ``numpy`` for the same search vectorized on arrays, ``dlx``
+        to model the puzzle as an exact cover problem solved by Dancing Links,
+        or ``rows`` to place one piece per line. The last two only apply to
+        populations of a single kind of queens or rooks, as many as the length
+        or height of the board. ``auto`` picks ``rows`` for these populations,
+        and ``backtracking`` otherwise.
+
+        If ``collect_stats`` is set, searches count their work in
+        :attr:`stats`. See :class:`.SearchStats`.
+
+        ``piece_order`` is either ``static`` to place pieces by UID, or
+        ``dynamic`` to place the most constrained kind of pieces first. See
+        :class:`DynamicSearchTree`.
+
+        ``square_order`` is the order in which squares are tried for each
+        piece. See :meth:`square_sequence`.
+        """
         self.length = length
         self.height = height
         assert isinstance(self.length, int)
@@ -142,8 +823,44 @@ class SolverContext(object):
             self.pieces[PIECE_LABELS[label]] = quantity
         assert sum(self.pieces.values()) > 0
 
+        assert piece_order in PIECE_ORDERS
+        self.piece_order = piece_order
+        assert square_order in SQUARE_ORDERS
+        self.square_order = square_order
+        self.collect_stats = collect_stats
+
+        # Pick the line by line search if the puzzle allows for it.
+        assert engine in ENGINES
+        if engine == 'auto':
+            engine = 'backtracking'
+            if self.exact_cover and (
+                    self.piece_order, self.square_order) == (
+                        'static', 'row-major'):
+                engine = 'rows'
+        self.engine = engine
+
+        if self.engine in ('dlx', 'rows'):
+            if not self.exact_cover:
+                raise ValueError("{} engine can't solve {!r}.".format(
+                    ENGINE_NAMES[self.engine], self))
+
+        if self.piece_order == 'dynamic' and self.engine != 'backtracking':
+            raise ValueError(
+                'Dynamic piece order is only available to the backtracking '
+                'engine.')
+
+        if self.square_order != 'row-major' and any([
+                self.engine != 'backtracking', self.piece_order != 'static']):
+            raise ValueError(
+                'Custom square order is only available to the backtracking '
+                'engine, with static piece order.')
+
         # Solver metadata.
         self.result_counter = 0
+        self.stats = None
+
+        # Event stopping the search in progress once set. See :meth:`asolve`.
+        self.cancellation = None
 
     def __repr__(self):
         """ Display all relevant object internals. """
@@ -153,37 +870,577 @@ class SolverContext(object):
                 uids_to_labels[uid]: quantity
                 for uid, quantity in self.pieces.items()})
 
+    def __getstate__(self):
+        """ Leave the cancellation out of copies sent to worker processes.
+        """
+        state = self.__dict__.copy()
+        state['cancellation'] = None
+        return state
+
+    @property
+    def cancelled(self):
+        """ Callable checking if the search in progress is cancelled, or
+        :keyword:`None` if it can't be. Searches raise
+        :exc:`.SearchCancelled` once it returns true. """
+        if self.cancellation is None:
+            return None
+        return self.cancellation.is_set
+
     @property
     def vector_size(self):
         return self.length * self.height
 
-    def solve(self):
-        """ Solve all possible positions of pieces within the context.
+    @property
+    def population(self):
+        """ Linear vector of piece UIDs, sorted in their placement order.
+
+        Pieces covering the widest area are placed first. See #5.
+        """
+        return tuple(chain.from_iterable([
+            [uid] * quantity
+            for uid, quantity in sorted(self.pieces.items())]))
+
+    @property
+    def exact_cover(self):
+        """ Check if the puzzle can be modeled as an exact cover problem.
+
+        Queens and rooks can't share a row or a column. If there is as many
+        pieces as rows, each row holds exactly one of them, and the same goes
+        for columns.
+        """
+        kinds = [uid for uid, quantity in self.pieces.items() if quantity]
+        if kinds not in ([Queen.uid], [Rook.uid]):
+            return False
+        return self.pieces[kinds[0]] in (self.length, self.height)
+
+    def territories(self):
+        """ Return the territory table of the board, indexed by UID and index.
+
+        Tables are precomputed once per board dimensions, so calling this
+        method ahead of the search allows for measuring this warm-up phase
+        separately. See :attr:`chessboard.board.Board.territories`.
+        """
+        return Board(self.length, self.height).territories
+
+    def square_sequence(self, uid):
+        """ Return all linear positions in the order to try them for a kind.
+
+        Orders are:
+
+        * ``row-major``: by linear position.
+        * ``center-out``: from the center of the board to its corners.
+        * ``edges-first``: from the edges of the board to its center, ring by
+          ring.
+        * ``least-constraining``: by increasing territory of the piece, i.e.
+          squares ruling out the fewest others first.
 
-        Depth-first, tree-traversal of the product space.
+        Ties are broken by linear position.
         """
-        # Create a new, empty board.
         board = Board(self.length, self.height)
+        if self.square_order == 'row-major':
+            return list(board.indexes)
 
-        # Iterate through all combinations of positions.
-        permutations = Permutations(self.pieces, self.vector_size)
-        for positions in permutations:
+        def center_distance(index):
+            """ Squared distance to the center, doubled to stay integral. """
+            x, y = board.index_to_coordinates(index)
+            x_offset = 2 * x - self.length + 1
+            y_offset = 2 * y - self.height + 1
+            return x_offset ** 2 + y_offset ** 2
 
-            # Reuse board but flush all pieces.
-            board.reset()
+        def edge_distance(index):
+            """ Distance to the nearest edge. """
+            x, y = board.index_to_coordinates(index)
+            return min(x, y, self.length - 1 - x, self.height - 1 - y)
 
-            for level, (piece_uid, linear_position) in enumerate(positions):
-                # Try to place the piece on the board.
-                try:
-                    board.add(piece_uid, linear_position)
-                # If one of the piece can't be added, throw the whole set, skip
-                # the rotten branch and proceed to the next.
-                except (OccupiedPosition, VulnerablePosition, AttackablePiece):
-                    permutations.skip_branch(level)
-                    break
+        def territory_size(index):
+            """ Number of squares covered by the piece. """
+            return popcount(board.territories[uid][index])
+
+        key = {
+            'center-out': center_distance,
+            'edges-first': edge_distance,
+            'least-constraining': territory_size}[self.square_order]
+        return sorted(board.indexes, key=lambda index: (key(index), index))
+
+    def search(self, symmetric=False, roots=None, after=None):
+        """ Generate placements of all solutions within the context.
+
+        Placements are produced as tuples of linear positions, indexed by
+        their level in the tree, i.e. aligned with :attr:`population`. See
+        :class:`SearchTree`.
 
+        If ``after`` is provided, the search resumes right after this
+        placement, previously produced by the same search. Trees retracing
+        their traversal from it continue from there, others search again
+        the placements before it.
+        """
+        if self.engine in ('dlx', 'rows'):
+            # Only roots of canonical placements are searched, but no
+            # restriction applies to other pieces.
+            if symmetric:
+                orbit_floor = self.orbit_floor()
+                roots = [
+                    index for index in (
+                        range(self.vector_size) if roots is None else roots)
+                    if orbit_floor[index] == index]
+            if self.engine == 'rows':
+                placements = self.rows_search(roots)
             else:
-                # All pieces fits, save solution and proceeed to the next
-                # permutation.
+                placements = self.dlx_search(roots)
+        else:
+            tree = self.search_tree(symmetric, roots)
+            if tree.resumable:
+                return tree.placements(after)
+            placements = tree.placements()
+        if after is not None:
+            placements = skip_through(placements, after)
+        return placements
+
+    def search_tree(self, symmetric=False, roots=None):
+        """ Return the tree to traverse, backed by the selected engine. """
+        if self.engine == 'numpy':
+            trees = (VectorizedSearchTree, InstrumentedVectorizedSearchTree)
+        elif self.piece_order == 'dynamic':
+            trees = (DynamicSearchTree, InstrumentedDynamicSearchTree)
+        elif self.square_order != 'row-major':
+            trees = (OrderedSearchTree, InstrumentedOrderedSearchTree)
+        else:
+            trees = (SearchTree, InstrumentedSearchTree)
+        if self.collect_stats:
+            return trees[1](self, symmetric, roots, self.stats)
+        return trees[0](self, symmetric, roots)
+
+    def reset_stats(self):
+        """ Start collecting statistics of a new search, if requested. """
+        if self.collect_stats:
+            self.stats = SearchStats(len(self.population))
+
+    def dancing_links(self, root):
+        """ Model the puzzle as an exact cover problem.
+
+        Each square is an option covering its row, column and, for queens,
+        its two diagonals. Rows and columns are primary if they all hold a
+        piece, secondary otherwise. Diagonals are always secondary.
+
+        Only squares from the ``root`` linear position are modeled, and the
+        root is forced into all solutions. So the lowest position of all
+        solutions is the root, and option positions are relative to it.
+        """
+        uid = Queen.uid if self.pieces.get(Queen.uid) else Rook.uid
+        quantity = self.pieces[uid]
+        board = Board(self.length, self.height)
+
+        lines = [
+            ('row', self.height, quantity == self.height),
+            ('column', self.length, quantity == self.length)]
+        if uid == Queen.uid:
+            diagonals = self.length + self.height - 1
+            lines += [
+                ('diagonal', diagonals, False),
+                ('antidiagonal', diagonals, False)]
+        # Number columns, primary first.
+        column_ids = {}
+        for primary in (True, False):
+            for label, count, is_primary in lines:
+                if is_primary == primary:
+                    for i in range(count):
+                        column_ids[label, i] = len(column_ids)
+        primary = sum(count for _, count, is_primary in lines if is_primary)
+
+        options = []
+        for index in range(root, self.vector_size):
+            x, y = board.index_to_coordinates(index)
+            option = [column_ids['row', y], column_ids['column', x]]
+            if uid == Queen.uid:
+                option += [
+                    column_ids['diagonal', x + y],
+                    column_ids['antidiagonal', x - y + self.height - 1]]
+            options.append(option)
+
+        links = DancingLinks(primary, len(column_ids) - primary, options)
+        links.select(0)
+        return links
+
+    def dlx_search(self, roots=None):
+        """ Generate placements of all solutions with Dancing Links.
+
+        Solutions are searched root by root, i.e. by lowest position, so they
+        are produced in the same order whatever the partition of roots.
+        """
+        for root in (range(self.vector_size) if roots is None else roots):
+            if self.stats is not None:
+                self.stats.nodes[0] += 1
+            for solution in self.dancing_links(root).solutions(
+                    self.cancelled, self.stats):
+                yield tuple([root] + sorted(
+                    root + option for option in solution))
+
+    def row_search(self):
+        """ Return the line by line search of the puzzle.
+
+        Lines are rows if there is as many pieces as rows, columns otherwise.
+        """
+        uid = Queen.uid if self.pieces.get(Queen.uid) else Rook.uid
+        return RowSearch(
+            self.length, self.height, diagonals=uid == Queen.uid,
+            transposed=self.pieces[uid] != self.height)
+
+    def rows_search(self, roots=None):
+        """ Generate placements of all solutions, one piece per line.
+
+        Solutions are searched by lowest position, so they are produced in
+        the same order whatever the partition of roots.
+        """
+        search = self.row_search()
+        for root in (range(self.vector_size) if roots is None else roots):
+            for placement in search.placements(
+                    root, self.cancelled, self.stats):
+                yield placement
+
+    def orbit_floor(self):
+        """ Lowest linear position each square is mapped to by symmetries. """
+        symmetries = Board(self.length, self.height).symmetries
+        return tuple(
+            min(mapping[index] for mapping in symmetries)
+            for index in range(self.vector_size))
+
+    def images(self, placement, symmetries=None):
+        """ Return the set of all placements symmetric to the one provided.
+
+        The provided placement is part of the set, through the identity.
+        Symmetries of the board can be provided to save their computation.
+        """
+        if symmetries is None:
+            symmetries = Board(self.length, self.height).symmetries
+        groups = population_groups(self.population)
+        images = set()
+        for mapping in symmetries:
+            # Reorder positions of interchangeable pieces after their
+            # transformation, to keep placements comparable. See #7.
+            image = ()
+            for start, end in groups:
+                image += tuple(sorted(
+                    mapping[index] for index in placement[start:end]))
+            images.add(image)
+        return images
+
+    def canonical_search(self, expand=False, roots=None, after=None):
+        """ Generate placements of solutions, reduced by board's symmetries.
+
+        Only canonical placements are searched for, i.e. the lowest
+        placements, lexicographically, of each set of solutions equivalent by
+        a symmetry of the board. The canonical placement's first piece is
+        necessarily the lowest square of its orbit, and so are all of its
+        siblings sharing the same UID. This restricts the search to a
+        fraction of the tree.
+
+        If ``expand`` is set, each canonical placement is expanded back into
+        all its distinct symmetric placements, including itself. Boards
+        invariant by some symmetries are only reported once.
+
+        If ``after`` is provided, the search resumes right after this
+        placement, previously produced by the same search.
+        """
+        symmetries = Board(self.length, self.height).symmetries
+        if expand and after is not None:
+            # Finish the expansion of the interrupted canonical placement.
+            images = self.images(after, symmetries)
+            for image in sorted(images):
+                if image > after:
+                    yield image
+            after = min(images)
+        for placement in self.search(
+                symmetric=True, roots=roots, after=after):
+            images = self.images(placement, symmetries)
+            if placement != min(images):
+                continue
+            if expand:
+                for image in sorted(images):
+                    yield image
+            else:
+                yield placement
+
+    def placements(self, symmetry=None, roots=None, after=None):
+        """ Dispatch the search of placements to the requested strategy. """
+        assert symmetry in SYMMETRY_MODES
+        if symmetry is None:
+            return self.search(roots=roots, after=after)
+        return self.canonical_search(
+            expand=symmetry == 'expand', roots=roots, after=after)
+
+    def distribute(self, task, workers, symmetry=None, roots=None):
+        """ Split the search tree and run each subtree in a pool of workers.
+
+        The tree is partitioned on the position of the first level's piece.
+        Each subtree is searched in a separate process by the ``task``
+        function, and results are produced in the same order as the
+        sequential search.
+
+        ``roots`` restricts the partitions to search. Statistics collected by
+        workers are merged into :attr:`stats`.
+        """
+        if roots is None:
+            roots = range(self.vector_size)
+        pool = multiprocessing.Pool(processes=workers)
+        try:
+            for result in pool.imap(task, [
+                    (self, [root], symmetry) for root in roots]):
+                result, stats = result
+                if stats is not None:
+                    self.stats.merge(stats)
+                yield result
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def cached_placements(self, cache, symmetry=None):
+        """ Return placements of solutions stored in ``cache``, or
+        :keyword:`None` if they are not.
+
+        Placements are produced in the order of the backtracking search, with
+        the default orders. Canonical placements depend on the orientation of
+        the board, so they are recomputed rather than trusted from the cache.
+        See :class:`.ResultCache`.
+        """
+        entry = cache.get(self, symmetry)
+        if entry is None or entry[1] is None:
+            return None
+        placements = entry[1]
+        if symmetry is None:
+            return sorted(placements)
+        symmetries = Board(self.length, self.height).symmetries
+        canonicals = sorted(set(
+            min(self.images(placement, symmetries))
+            for placement in placements))
+        if symmetry == 'fundamental':
+            return canonicals
+        return [
+            image for placement in canonicals
+            for image in sorted(self.images(placement, symmetries))]
+
+    def solutions(
+            self, symmetry=None, workers=1, checkpoint=None, cache=None):
+        """ Generate placements of all solutions within the context.
+
+        Placements are tuples of linear positions, aligned with
+        :attr:`population`. They are the raw state of the search, produced
+        without materializing any board.
+
+        ``symmetry`` is either :keyword:`None` to search for all solutions,
+        ``fundamental`` to only produce one solution per set of symmetric
+        solutions, or ``expand`` to produce all solutions while only searching
+        for fundamental ones.
+
+        Search is spread over several processes if ``workers`` is greater than
+        1. See :meth:`distribute`.
+
+        Progress of the search is saved to ``checkpoint`` if provided, and the
+        search resumes from its cursor. See :meth:`resumable_solutions`.
+
+        Solutions are read from ``cache`` if found there, and stored to it
+        once all of them are produced. See :meth:`cached_placements`. The
+        cache is bypassed by checkpointed searches and statistics collection.
+        """
+        self.reset_stats()
+        if checkpoint is not None:
+            # Close the search along, so it accounts for the last solution.
+            placements = self.resumable_solutions(
+                checkpoint, symmetry, workers)
+            try:
+                for placement in placements:
+                    yield placement
+            finally:
+                placements.close()
+            return
+
+        found = None
+        if cache is not None and not self.collect_stats:
+            cached = self.cached_placements(cache, symmetry)
+            if cached is not None:
+                self.result_counter = 0
+                for placement in cached:
+                    self.result_counter += 1
+                    yield placement
+                return
+            found = []
+
+        if workers > 1:
+            placements = chain.from_iterable(
+                self.distribute(search_subtree, workers, symmetry))
+        else:
+            placements = self.placements(symmetry)
+
+        self.result_counter = 0
+        for placement in placements:
+            self.result_counter += 1
+            if found is not None:
+                found.append(placement)
+                # Stop retaining solutions the cache won't store.
+                if len(found) > cache.max_solutions:
+                    found = None
+            yield placement
+
+        if cache is not None and not self.collect_stats:
+            cache.put(self, symmetry, self.result_counter, found)
+
+    def search_params(self, symmetry=None):
+        """ Return parameters determining the order of solutions. """
+        uids_to_labels = {uid: label for label, uid in PIECE_LABELS.items()}
+        return {
+            'length': self.length,
+            'height': self.height,
+            'pieces': {
+                uids_to_labels[uid]: quantity
+                for uid, quantity in self.pieces.items() if quantity},
+            'engine': self.engine,
+            'piece_order': self.piece_order,
+            'square_order': self.square_order,
+            'symmetry': symmetry}
+
+    def resumable_solutions(self, checkpoint, symmetry=None, workers=1):
+        """ Generate placements of solutions, from and to a checkpoint.
+
+        The tree is searched partition by partition, i.e. by position of the
+        first piece. The cursor is moved to each solution consumed, and to
+        the end of each partition. The interrupted partition resumes right
+        after its cursor, in this process. See :class:`.Checkpoint`.
+        """
+        checkpoint.bind(self.search_params(symmetry))
+        # Save the initial cursor to fail early on unwritable locations.
+        checkpoint.save()
+
+        roots = range(checkpoint.root, self.vector_size)
+        partitions = []
+        if checkpoint.cursor is not None:
+            partitions.append(self.placements(
+                symmetry, roots=roots[:1], after=checkpoint.cursor))
+            roots = roots[1:]
+        if workers > 1:
+            partitions = chain(partitions, self.distribute(
+                search_subtree, workers, symmetry, roots))
+        else:
+            partitions = chain(partitions, (
+                self.placements(symmetry, roots=[root]) for root in roots))
+
+        self.result_counter = checkpoint.result_counter
+        for root in range(checkpoint.root, self.vector_size):
+            for placement in next(partitions):
                 self.result_counter += 1
-                yield board
+                try:
+                    yield placement
+                except GeneratorExit:
+                    # The consumer got the solution before closing the search.
+                    checkpoint.update(
+                        root, placement, self.result_counter, force=True)
+                    raise
+                checkpoint.update(root, placement, self.result_counter)
+            checkpoint.update(root + 1, None, self.result_counter)
+        checkpoint.update(
+            self.vector_size, None, self.result_counter, force=True)
+
+    def solve(self, symmetry=None, workers=1, checkpoint=None, cache=None):
+        """ Solve all possible positions of pieces within the context.
+
+        Yield an immutable :class:`.Solution` per placement. Solutions can be
+        retained, hashed and sent to other processes; boards are only built
+        on demand.
+
+        See :meth:`solutions` for parameters.
+        """
+        population = self.population
+        for placement in self.solutions(
+                symmetry, workers, checkpoint, cache):
+            yield Solution(self.length, self.height, population, placement)
+
+    def asolve(self, symmetry=None, workers=1, cache=None, **kwargs):
+        """ Solve all possible positions asynchronously, for asyncio.
+
+        Return an asynchronous iterator producing lists of :class:`.Solution`,
+        searched in an executor to not block the event loop. Keyword arguments
+        tune batches and the executor, see :class:`.AsyncSolutions`.
+
+        Cancelling the iteration stops the search at its next node, through
+        :attr:`cancellation`. So a context runs one asynchronous search at a
+        time.
+
+        Requires Python 3.5 or newer. See :meth:`solve` for parameters.
+        """
+        # asyncio is not available on Python 2.
+        from chessboard.aio import AsyncSolutions
+        self.cancellation = threading.Event()
+        return AsyncSolutions(
+            self.solve(symmetry, workers, cache=cache),
+            cancellation=self.cancellation, **kwargs)
+
+    def count(self, symmetry=None, workers=1, roots=None, cache=None):
+        """ Count all possible positions of pieces within the context.
+
+        Same search as :meth:`solve`, but solutions are never materialized:
+        the tree is explored with bare bitmasks, without any :class:`.Board`
+        or :class:`.Piece` instance.
+
+        The count is read from ``cache`` if found there, and stored to it
+        otherwise. Partial counts of some ``roots`` are never cached.
+        """
+        if cache is not None and roots is None and not self.collect_stats:
+            entry = cache.get(self, symmetry)
+            if entry is None:
+                self.count(symmetry, workers)
+                cache.put(self, symmetry, self.result_counter)
+            else:
+                self.reset_stats()
+                self.result_counter = entry[0]
+            return self.result_counter
+
+        self.reset_stats()
+        if workers > 1:
+            self.result_counter = sum(
+                self.distribute(count_subtree, workers, symmetry))
+            return self.result_counter
+
+        if symmetry is not None:
+            assert symmetry in SYMMETRY_MODES
+            self.result_counter = sum(
+                1 for _ in self.canonical_search(
+                    expand=symmetry == 'expand', roots=roots))
+            return self.result_counter
+
+        if self.collect_stats:
+            # Counts skip nodes of the last level, so statistics are those
+            # of the enumeration.
+            self.result_counter = sum(1 for _ in self.search(roots=roots))
+        elif self.engine == 'dlx':
+            self.result_counter = sum(
+                self.dancing_links(root).count() for root in (
+                    range(self.vector_size) if roots is None else roots))
+        elif self.engine == 'rows':
+            search = self.row_search()
+            self.result_counter = sum(
+                search.count(root) for root in (
+                    range(self.vector_size) if roots is None else roots))
+        else:
+            self.result_counter = self.search_tree(roots=roots).count()
+        return self.result_counter
+
+
+def search_subtree(params):
+    """ Return all placements of a subtree of the search space.
+
+    Statistics of the search are returned along, if collected.
+
+    Runs in a worker process. See :meth:`SolverContext.distribute`.
+    """
+    solver, roots, symmetry = params
+    solver.reset_stats()
+    return list(solver.placements(symmetry, roots)), solver.stats
+
+
+def count_subtree(params):
+    """ Count solutions of a subtree of the search space.
+
+    Statistics of the search are returned along, if collected.
+
+    Runs in a worker process. See :meth:`SolverContext.distribute`.
+    """
+    solver, roots, symmetry = params
+    return solver.count(symmetry, roots=roots), solver.stats
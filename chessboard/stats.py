@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015-2017 Kevin Deldycke <kevin@deldycke.com>
+#                         and contributors.
+# All Rights Reserved.
+#
+# This program is Free Software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+
+""" Instrumentation of the search. """
+
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals
+)
+
+
+class SearchStats(object):
+    """ Counters of the work done by a search, by level of the tree.
+
+    Nodes are the pieces placed at each level, so solutions are the nodes of
+    the last level. Prunes are the nodes below which the search doesn't go,
+    as remaining pieces can't fit: search trees detect them by forward
+    checking, row by row and Dancing Links searches by the lack of position
+    left for the next piece.
+
+    All engines count the nodes they actually visit, so counters of an
+    engine depend on its own tree.
+    """
+
+    def __init__(self, depth):
+        """ Initialize all counters of a tree of ``depth`` levels to zero. """
+        assert depth > 0
+        self.depth = depth
+        self.nodes = [0] * depth
+        self.prunes = [0] * depth
+
+    def __repr__(self):
+        """ Display all relevant object internals. """
+        return '<{}: nodes={}, prunes={}>'.format(
+            self.__class__.__name__, self.total_nodes, self.total_prunes)
+
+    @property
+    def total_nodes(self):
+        """ Number of nodes visited at all levels. """
+        return sum(self.nodes)
+
+    @property
+    def total_prunes(self):
+        """ Number of nodes pruned at all levels. """
+        return sum(self.prunes)
+
+    def merge(self, other):
+        """ Add counters of another search of the same tree. """
+        assert other.depth == self.depth
+        for level in range(self.depth):
+            self.nodes[level] += other.nodes[level]
+            self.prunes[level] += other.prunes[level]
+
+    def report(self, elapsed=None):
+        """ Return a human-readable table of the counters, one row per level.
+
+        Throughput in nodes per second is added if the ``elapsed`` time of
+        the search is provided.
+        """
+        headers = ('Level', 'Nodes', 'Prunes')
+        rows = [
+            [level, self.nodes[level], self.prunes[level]]
+            for level in range(self.depth)]
+        rows.append(['Total', self.total_nodes, self.total_prunes])
+        widths = [
+            max(len('{}'.format(cell)) for cell in column)
+            for column in zip(headers, *rows)]
+        lines = [
+            '  '.join(
+                '{}'.format(cell).rjust(width)
+                for cell, width in zip(row, widths))
+            for row in [headers] + rows]
+        if elapsed:
+            lines.append('{:.0f} nodes per second.'.format(
+                self.total_nodes / elapsed))
+        return '\n'.join(lines)
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015-2017 Kevin Deldycke <kevin@deldycke.com>
+#                         and contributors.
+# All Rights Reserved.
+#
+# This program is Free Software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+
+""" Tests of the asynchronous API.
+
+Coroutines are driven by callbacks, as the package still compiles on Python
+versions without the ``async`` and ``await`` keywords.
+"""
+
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals
+)
+
+import sys
+import time
+import unittest
+
+import pytest
+from chessboard import SolverContext
+
+if sys.version_info >= (3, 5):
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+
+
+def collect(loop, solutions):
+    """ Return a future of all solutions of an asynchronous iterator, and of
+    the number of batches they came in. """
+    result = loop.create_future()
+    found = []
+    batches = []
+
+    def step(batch=None):
+        if batch is not None:
+            if isinstance(batch.exception(), StopAsyncIteration):
+                result.set_result((found, len(batches)))
+                return
+            batches.append(batch.result())
+            found.extend(batch.result())
+        solutions.__anext__().add_done_callback(step)
+
+    step()
+    return result
+
+
+@pytest.mark.skipif(
+    sys.version_info < (3, 5), reason='Requires asynchronous iterators.')
+class TestAsyncSolutions(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_batches(self):
+        solver = SolverContext(5, 5, king=2, queen=1, knight=1)
+        expected = list(solver.solve())
+        found, batches = self.loop.run_until_complete(collect(
+            self.loop, solver.asolve(
+                batch_size=500, interval=60, loop=self.loop)))
+        assert found == expected
+        assert batches == -(-len(expected) // 500)
+
+        # Partial batches are delivered after a delay.
+        found, batches = self.loop.run_until_complete(collect(
+            self.loop, solver.asolve(interval=0, loop=self.loop)))
+        assert found == expected
+        assert batches == len(expected)
+
+        # No solution.
+        solver = SolverContext(2, 2, queen=2)
+        assert self.loop.run_until_complete(collect(
+            self.loop, solver.asolve(loop=self.loop))) == ([], 0)
+
+    def test_concurrency(self):
+        """ Several puzzles are solved concurrently, while the event loop
+        keeps running. """
+        puzzles = [
+            {'length': 6, 'height': 6, 'king': 2, 'queen': 1, 'bishop': 1,
+             'knight': 1},
+            {'length': 9, 'height': 9, 'queen': 9},
+            {'length': 5, 'height': 5, 'king': 3, 'knight': 2},
+            {'length': 6, 'height': 6, 'rook': 2, 'king': 2, 'knight': 1}]
+        expected = [
+            list(SolverContext(**puzzle).solve()) for puzzle in puzzles]
+
+        # Measure delays between ticks of a 10 ms timer.
+        ticks = [time.time()]
+
+        def tick():
+            ticks.append(time.time())
+            if not searches.done():
+                self.loop.call_later(0.01, tick)
+
+        searches = asyncio.gather(*[
+            collect(self.loop, SolverContext(**puzzle).asolve(
+                batch_size=100, loop=self.loop))
+            for puzzle in puzzles])
+        self.loop.call_later(0.01, tick)
+        results = self.loop.run_until_complete(searches)
+
+        assert [found for found, _ in results] == expected
+        gaps = [end - start for start, end in zip(ticks, ticks[1:])]
+        assert len(gaps) > 10
+        assert max(gaps) < 0.5
+
+    def test_cancellation(self):
+        executor = ThreadPoolExecutor(1)
+        solver = SolverContext(9, 9, king=3, queen=2, bishop=2, knight=1)
+        solutions = solver.asolve(
+            batch_size=10 ** 9, interval=60, executor=executor,
+            loop=self.loop)
+        batch = solutions.__anext__()
+        self.loop.call_later(0.2, batch.cancel)
+
+        start = time.time()
+        with pytest.raises(asyncio.CancelledError):
+            self.loop.run_until_complete(batch)
+        executor.shutdown(wait=True)
+        assert time.time() - start < 5
+
+        assert solutions.cancelled
+        # The search was closed.
+        assert solutions.solutions.gi_frame is None
+        with pytest.raises(StopAsyncIteration):
+            self.loop.run_until_complete(solutions.__anext__())
+
+    def test_cancellation_without_solution(self):
+        """ Searches are stopped between solutions. """
+        for engine in ('backtracking', 'numpy'):
+            executor = ThreadPoolExecutor(1)
+            # No solution, but a long search.
+            solver = SolverContext(8, 8, engine=engine, king=17)
+            solutions = solver.asolve(
+                batch_size=1, interval=60, executor=executor,
+                loop=self.loop)
+            batch = solutions.__anext__()
+            self.loop.call_later(0.2, batch.cancel)
+
+            start = time.time()
+            with pytest.raises(asyncio.CancelledError):
+                self.loop.run_until_complete(batch)
+            executor.shutdown(wait=True)
+            assert time.time() - start < 5
+
+            assert not solutions.exhausted
+            assert solutions.solutions.gi_frame is None
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015-2017 Kevin Deldycke <kevin@deldycke.com>
+#                         and contributors.
+# All Rights Reserved.
+#
+# This program is Free Software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals
+)
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from chessboard import SolverContext
+from chessboard.batch import (
+    geometry_chunks,
+    read_puzzles,
+    solve_many,
+    solve_puzzle
+)
+from chessboard.results import ResultCache
+
+
+class TestBatch(unittest.TestCase):
+
+    puzzles = [
+        {'id': 'tiny', 'length': 3, 'height': 3, 'king': 2, 'rook': 1},
+        {'id': 'queens', 'length': 6, 'height': 6, 'queen': 6},
+        {'id': 'count', 'length': 8, 'height': 8, 'queen': 8,
+         'count_only': True},
+        {'id': 'fundamental', 'length': 5, 'height': 5, 'queen': 5,
+         'symmetry': 'fundamental'},
+        {'id': 'transposed', 'length': 4, 'height': 3, 'knight': 2,
+         'bishop': 1},
+    ]
+
+    def test_read_puzzles(self):
+        puzzles = list(read_puzzles([
+            '{"id": "a", "length": 2, "height": 2, "king": 1}\n',
+            '\n',
+            '{"length": 2, "height": 2, "rook": 1}\n']))
+        assert puzzles == [
+            {'id': 'a', 'length': 2, 'height': 2, 'king': 1},
+            {'id': 3, 'length': 2, 'height': 2, 'rook': 1}]
+
+        errors = list(read_puzzles(['{"id": 1\n', '[1, 2]\n']))
+        assert [error['id'] for error in errors] == [1, 2]
+        assert errors[0]['error'].startswith('ValueError: ')
+        assert errors[1]['error'] == 'ValueError: puzzle is not an object.'
+        assert [solve_puzzle(error) for error in errors] == errors
+
+    def test_solve_puzzle(self):
+        result = solve_puzzle(self.puzzles[0])
+        assert list(result) == ['id', 'count', 'solutions']
+        assert result['id'] == 'tiny'
+        assert result['count'] == 4
+        assert result['solutions'][0] == {'rook': [1], 'king': [6, 8]}
+
+        assert solve_puzzle(self.puzzles[2]) == {'id': 'count', 'count': 92}
+        assert solve_puzzle(self.puzzles[1], count_only=True) == {
+            'id': 'queens', 'count': 4}
+        assert solve_puzzle(self.puzzles[3])['count'] == 2
+
+    def test_limit(self):
+        puzzle = dict(self.puzzles[1], limit=3)
+        result = solve_puzzle(puzzle)
+        assert result['count'] == 3
+        assert result['solutions'] == solve_puzzle(
+            self.puzzles[1])['solutions'][:3]
+        assert solve_puzzle(puzzle, count_only=True) == {
+            'id': 'queens', 'count': 3}
+        assert solve_puzzle(dict(puzzle, limit=10))['count'] == 4
+
+    def test_invalid_puzzles(self):
+        for puzzle in [
+                {'length': 3, 'height': 3, 'dragon': 1},
+                {'length': 0, 'height': 3, 'king': 1},
+                {'length': 3, 'king': 1},
+                {'length': 3, 'height': 3, 'king': 1, 'engine': 'dlx'},
+                {'length': 3, 'height': 3, 'king': 1, 'symmetry': 'mirror'},
+                {'length': 3, 'height': 3, 'king': 1, 'limit': 0}]:
+            result = solve_puzzle(dict(puzzle, id='invalid'))
+            assert list(result) == ['id', 'error']
+
+    def test_solve_many(self):
+        expected = [solve_puzzle(puzzle) for puzzle in self.puzzles]
+        assert list(solve_many(self.puzzles)) == expected
+        # Results of workers come in no particular order.
+        results = list(solve_many(self.puzzles, workers=3))
+        assert sorted(results, key=lambda result: result['id']) == sorted(
+            expected, key=lambda result: result['id'])
+
+    def test_geometry_chunks(self):
+        puzzles = [
+            {'id': 1, 'length': 3, 'height': 3},
+            {'id': 2, 'length': 4, 'height': 3},
+            {'id': 3, 'error': 'ValueError: '},
+            {'id': 4, 'length': 3, 'height': 3},
+            {'id': 5, 'length': [], 'height': 3},
+            {'id': 6, 'length': 3, 'height': 3}]
+        chunks = [
+            [puzzle['id'] for puzzle in chunk]
+            for chunk in geometry_chunks(puzzles, size=2)]
+        # Full chunks come first.
+        assert chunks == [[1, 4], [3, 5], [2], [6]]
+
+    def test_malformed_lines(self):
+        lines = [
+            '{"id": "a", "length": 3, "height": 3, "queen": 2}\n',
+            'not json\n',
+            '{"id": "b", "length": 4, "height": 4, "queen": 4}\n']
+        for workers in (1, 2):
+            results = sorted(
+                solve_many(read_puzzles(lines), workers=workers),
+                key=lambda result: str(result['id']))
+            assert [result['id'] for result in results] == [2, 'a', 'b']
+            assert list(results[0]) == ['id', 'error']
+            assert results[2]['count'] == 2
+
+    def test_cache(self):
+        folder = tempfile.mkdtemp()
+        try:
+            path = os.path.join(folder, 'results.db')
+            expected = [solve_puzzle(puzzle) for puzzle in self.puzzles]
+            for workers in (1, 2, 1):
+                results = list(solve_many(
+                    self.puzzles, workers=workers, cache_path=path))
+                assert sorted(results, key=lambda r: r['id']) == sorted(
+                    expected, key=lambda r: r['id'])
+            with ResultCache(path) as cache:
+                assert cache.get(SolverContext(3, 4, knight=2, bishop=1))
+        finally:
+            shutil.rmtree(folder)
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015-2017 Kevin Deldycke <kevin@deldycke.com>
+#                         and contributors.
+# All Rights Reserved.
+#
+# This program is Free Software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals
+)
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import pytest
+from click.testing import CliRunner
+from chessboard import Board
+from chessboard.benchmark import (
+    Benchmark,
+    mann_whitney,
+    percentile,
+    run_scenario,
+    summarize
+)
+from chessboard.cli import cli
+
+
+def fake_results(timings, method='solve'):
+    """ Results of a single 4-queens scenario, measured ``timings``. """
+    return [{'length': 4, 'height': 4, 'queen': 4, 'engine': 'auto',
+             'method': method, 'solutions': 2, 'timings': timings}]
+
+
+class TestStatistics(unittest.TestCase):
+
+    def test_percentile(self):
+        assert percentile([3, 1, 2], 0.5) == 2
+        assert percentile([4, 1, 2, 3], 0.5) == 2.5
+        assert percentile([1, 2, 3, 4, 5], 0.25) == 2
+        assert percentile([7], 0.75) == 7
+
+    def test_summarize(self):
+        assert list(summarize([5, 1, 4, 2, 3]).items()) == [
+            ('runs', 5), ('min', 1), ('median', 3), ('iqr', 2)]
+
+    def test_mann_whitney(self):
+        # All 252 arrangements of 5 against 5 values, one being the most
+        # extreme.
+        slow = [10, 11, 12, 13, 14]
+        fast = [1, 2, 3, 4, 5]
+        assert mann_whitney(slow, fast) == 1 / 252
+        assert mann_whitney(fast, slow) == 1
+        assert mann_whitney([1, 3], [2]) == 2 / 3
+
+        # Ties.
+        assert mann_whitney([1, 1, 1], [1, 1, 1]) == 1
+        assert mann_whitney(slow + [5], fast) < 0.01
+        assert mann_whitney(fast, slow + [5]) > 0.99
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_run_scenario(self):
+        result = run_scenario({
+            'length': 4, 'height': 4, 'queen': 4, 'method': 'count',
+            'warmups': 2, 'repetitions': 3})
+        assert result['solutions'] == 2
+        assert result['method'] == 'count'
+        assert len(result['timings']) == 3
+        assert 'warmups' not in result
+
+        result = run_scenario({'length': 4, 'height': 4, 'queen': 4})
+        assert result['method'] == 'solve'
+        assert result['engine'] == 'auto'
+        assert result['solutions'] == 2
+        assert len(result['timings']) == 1
+
+        result = run_scenario({
+            'length': 5, 'height': 5, 'queen': 5, 'engine': 'dlx'})
+        assert result['engine'] == 'dlx'
+        assert result['solutions'] == 10
+
+    def test_flush_caches(self):
+        Board(5, 3).territories
+        run_scenario({'length': 3, 'height': 3, 'king': 2, 'rook': 1})
+        assert list(Board.territory_tables.entries) == [(3, 3)]
+        assert Board.territory_tables.misses == 1
+
+    def test_jobs(self):
+        jobs = list(Benchmark.jobs(warmups=0, repetitions=7))
+        assert len(jobs) == len(Benchmark.scenarii) * len(Benchmark.methods)
+        assert all(job['repetitions'] == 7 for job in jobs)
+        assert all(job['warmups'] == 0 for job in jobs)
+        # n queens problems go well past 9x9.
+        assert max(
+            job['queen'] for job in jobs if set(job) == set([
+                'length', 'height', 'queen', 'method', 'warmups',
+                'repetitions'])) == 14
+
+    def test_compare(self):
+        baseline = Benchmark()
+        baseline.add(fake_results([1.0, 1.1, 0.9, 0.8, 1.2]))
+        current = Benchmark()
+        current.add(fake_results([1.1, 1.2, 1.0, 0.9, 1.0]))
+        current.add(fake_results([1.0], method='count'))
+
+        report = current.compare()
+        assert len(report) == 2
+        assert 'regression' not in report
+        # Sorted by scenario.
+        assert list(report['method']) == ['count', 'solve']
+        row = report.iloc[1]
+        assert (row['queen'], row['king']) == (4, 0)
+        assert (row['runs'], row['median']) == (5, 1.0)
+
+        report = current.compare(baseline)
+        assert list(report['regression']) == [False, False]
+        assert report.iloc[1]['change'] == 0
+
+        slower = Benchmark()
+        slower.add(fake_results([2.0, 2.1, 1.9, 2.2, 2.3]))
+        report = slower.compare(baseline)
+        assert bool(report.iloc[0]['regression'])
+        assert report.iloc[0]['p_value'] == 1 / 252
+        # Too small a slowdown.
+        assert not slower.compare(baseline, threshold=2).iloc[0]['regression']
+        # Too few runs to be significant.
+        assert not slower.compare(baseline, alpha=0.001).iloc[0]['regression']
+
+    def test_compare_context(self):
+        baseline = Benchmark()
+        baseline.add(fake_results([1.0, 1.1, 0.9, 0.8, 1.2]))
+        # Results of another interpreter.
+        baseline.results['python'] = '0.0.0'
+        current = Benchmark()
+        current.add(fake_results([2.0, 2.1, 1.9, 2.2, 2.3]))
+        with pytest.raises(ValueError):
+            current.compare(baseline)
+
+        # Other versions of the solver are compared, unless filtered out.
+        baseline = Benchmark()
+        baseline.add(fake_results([1.0, 1.1, 0.9, 0.8, 1.2]))
+        baseline.results['chessboard'] = '0.1'
+        assert bool(current.compare(baseline).iloc[0]['regression'])
+        assert bool(current.compare(
+            baseline, baseline_version='0.1').iloc[0]['regression'])
+        with pytest.raises(ValueError):
+            current.compare(baseline, baseline_version='0.2')
+
+    def test_csv(self):
+        folder = tempfile.mkdtemp()
+        try:
+            path = os.path.join(folder, 'benchmark.csv')
+            benchmark = Benchmark(path)
+            benchmark.load_csv()
+            benchmark.add(fake_results([1.0, 2.0]))
+            benchmark.save_csv()
+
+            loaded = Benchmark(path)
+            loaded.load_csv()
+            assert list(loaded.timings().values()) == [[1.0, 2.0]]
+        finally:
+            shutil.rmtree(folder)
+
+    def test_cli_baseline(self):
+        folder = tempfile.mkdtemp()
+        scenarii, methods = Benchmark.scenarii, Benchmark.methods
+        Benchmark.scenarii = [{'length': 4, 'height': 4, 'queen': 4}]
+        Benchmark.methods = ['solve']
+        try:
+            path = os.path.join(folder, 'benchmark.csv')
+            # Impossibly fast baseline.
+            baseline = Benchmark(path)
+            baseline.add(fake_results([1e-9, 2e-9, 3e-9, 4e-9, 5e-9]))
+            baseline.save_csv()
+
+            # Results and baseline share the same file: the new run must not
+            # be part of its own baseline.
+            result = CliRunner().invoke(cli, [
+                'benchmark', '--warmups', '0', '--repetitions', '5',
+                '--output', path, '--baseline', path])
+            assert result.exit_code == 1
+            assert 'True' in result.output
+
+            updated = Benchmark(path)
+            updated.load_csv()
+            assert len(list(updated.timings().values())[0]) == 10
+        finally:
+            Benchmark.scenarii, Benchmark.methods = scenarii, methods
+            shutil.rmtree(folder)
@@ -28,7 +28,18 @@ from __future__ import (
 import unittest
 
 import pytest
-from chessboard import Board, ForbiddenCoordinates, ForbiddenIndex
+from chessboard import (
+    PIECE_CLASSES,
+    AttackablePiece,
+    Board,
+    ForbiddenCoordinates,
+    ForbiddenIndex,
+    King,
+    OccupiedPosition,
+    Queen,
+    Rook,
+    VulnerablePosition
+)
 
 
 class TestBoard(unittest.TestCase):
@@ -82,3 +93,105 @@ class TestBoard(unittest.TestCase):
             Board(3, 3).index_to_coordinates(-1)
         with pytest.raises(ForbiddenIndex):
             Board(3, 3).index_to_coordinates(9)
+
+    def test_vector_bitmask_conversion(self):
+        board = Board(3, 3)
+        vector = [
+            True, False, False,
+            False, True, False,
+            False, False, True]
+        assert board.vector_to_bitmask(vector) == 0b100010001
+        assert board.bitmask_to_vector(0b100010001) == vector
+        assert board.vector_to_bitmask(board.new_vector()) == 0
+        assert board.bitmask_to_vector(0) == board.new_vector()
+
+    def test_add(self):
+        board = Board(3, 3)
+        board.add(King.uid, 0)
+        assert board.occupancy == 0b000000001
+        assert board.exposed_territory == 0b000011011
+        board.add(Rook.uid, 5)
+        assert board.occupancy == 0b000100001
+        assert board.exposed_territory == 0b100111111
+        assert len(board.pieces) == 2
+
+    def test_add_errors(self):
+        board = Board(3, 3)
+        board.add(King.uid, 0)
+        with pytest.raises(OccupiedPosition):
+            board.add(Rook.uid, 0)
+        with pytest.raises(VulnerablePosition):
+            board.add(Rook.uid, 4)
+        with pytest.raises(AttackablePiece):
+            board.add(Rook.uid, 2)
+        # Rejected pieces leave the board untouched.
+        assert board.occupancy == 0b000000001
+        assert board.exposed_territory == 0b000011011
+        assert len(board.pieces) == 1
+
+    def test_square_symmetries(self):
+        symmetries = Board(3, 3).symmetries
+        assert len(symmetries) == 8
+        assert len(set(symmetries)) == 8
+        for mapping in symmetries:
+            assert sorted(mapping) == list(range(9))
+            # The center is a fixed point.
+            assert mapping[4] == 4
+        assert set(mapping[0] for mapping in symmetries) == set([0, 2, 6, 8])
+
+    def test_rectangular_symmetries(self):
+        symmetries = Board(3, 2).symmetries
+        assert len(symmetries) == 4
+        assert set(symmetries) == set([
+            (0, 1, 2, 3, 4, 5),
+            (2, 1, 0, 5, 4, 3),
+            (3, 4, 5, 0, 1, 2),
+            (5, 4, 3, 2, 1, 0)])
+
+    def test_territory_table(self):
+        board = Board(4, 3)
+        table = board.territories
+        assert len(table) == len(PIECE_CLASSES)
+        for uid, klass in PIECE_CLASSES.items():
+            assert len(table[uid]) == board.size
+            for index in board.indexes:
+                assert board.bitmask_to_vector(table[uid][index]) == \
+                    klass(board, index).territory
+        # Tables are shared by boards of the same dimensions.
+        assert Board(4, 3).territories is table
+
+    def test_get(self):
+        board = Board(3, 2)
+        board.add(King.uid, 4)
+        assert board.get(1, 1).uid == King.uid
+        assert board.get(1, 1).index == 4
+        assert board.get(0, 0) is None
+        # Out of bounds coordinates.
+        assert board.get(3, 0) is None
+        assert board.get(0, 2) is None
+        board.reset()
+        assert board.get(1, 1) is None
+        assert board.squares == {}
+
+    def test_render(self):
+        board = Board(3, 2)
+        board.add(King.uid, 0)
+        board.add(Queen.uid, 5)
+        assert str(board) == '\n'.join([
+            '┌───┬───┬───┐',
+            '│ ♚ │   │   │',
+            '├───┼───┼───┤',
+            '│   │   │ ♛ │',
+            '└───┴───┴───┘'])
+
+    def test_render_placement(self):
+        board = Board(3, 2)
+        assert board.render_placement(
+            (King.uid, Queen.uid), (0, 5)) == '\n'.join([
+                '┌───┬───┬───┐',
+                '│ ♚ │   │   │',
+                '├───┼───┼───┤',
+                '│   │   │ ♛ │',
+                '└───┴───┴───┘'])
+        # Rendering a placement leaves the board untouched.
+        assert not board.pieces
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015-2017 Kevin Deldycke <kevin@deldycke.com>
+#                         and contributors.
+# All Rights Reserved.
+#
+# This program is Free Software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals
+)
+
+import os
+import unittest
+
+import pytest
+from chessboard import Board
+from chessboard.cache import CACHE_SIZE_VARIABLE, LRUCache, cache_size
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def test_hits_and_misses(self):
+        cache = LRUCache(max_size=2)
+        assert cache.get('a', lambda: 1) == 1
+        assert cache.get('a', lambda: 2) == 1
+        assert cache.get('b', lambda: 3) == 3
+        assert (cache.hits, cache.misses, cache.evictions) == (1, 2, 0)
+        assert len(cache) == 2
+
+    def test_eviction(self):
+        cache = LRUCache(max_size=2)
+        cache.get('a', lambda: 1)
+        cache.get('b', lambda: 2)
+        # Refresh a, so b becomes the least recently used entry.
+        cache.get('a', lambda: 1)
+        cache.get('c', lambda: 3)
+        assert 'a' in cache
+        assert 'b' not in cache
+        assert 'c' in cache
+        assert cache.evictions == 1
+        assert len(cache) == 2
+
+    def test_clear(self):
+        cache = LRUCache(max_size=1)
+        cache.get('a', lambda: 1)
+        cache.get('b', lambda: 2)
+        cache.clear()
+        assert len(cache) == 0
+        assert (cache.hits, cache.misses, cache.evictions) == (0, 0, 0)
+        assert cache.memory_usage == 0
+
+    def test_configurable_size(self):
+        value = os.environ.pop(CACHE_SIZE_VARIABLE, None)
+        try:
+            assert cache_size() == 16
+            assert LRUCache().max_size == 16
+            os.environ[CACHE_SIZE_VARIABLE] = '3'
+            assert cache_size() == 3
+            assert LRUCache().max_size == 3
+            assert LRUCache(max_size=5).max_size == 5
+            for invalid in ('0', '-1', 'big'):
+                os.environ[CACHE_SIZE_VARIABLE] = invalid
+                with pytest.raises(ValueError):
+                    cache_size()
+        finally:
+            os.environ.pop(CACHE_SIZE_VARIABLE, None)
+            if value is not None:
+                os.environ[CACHE_SIZE_VARIABLE] = value
+
+    def test_memory_usage(self):
+        cache = LRUCache()
+        cache.get('small', lambda: (1, 2))
+        small = cache.memory_usage
+        assert small > 0
+        cache.get('big', lambda: tuple(range(1000)))
+        assert cache.memory_usage > small
+        assert cache.stats['memory_usage'] == cache.memory_usage
+
+    def test_bounded_territory_tables(self):
+        tables = Board.territory_tables
+        max_size = tables.max_size
+        try:
+            tables.clear()
+            tables.max_size = 2
+            for length in range(1, 5):
+                Board(length, 3).territories
+            assert len(tables) == 2
+            assert tables.evictions == 2
+            assert (4, 3) in tables
+            assert (1, 3) not in tables
+        finally:
+            tables.max_size = max_size
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015-2017 Kevin Deldycke <kevin@deldycke.com>
+#                         and contributors.
+# All Rights Reserved.
+#
+# This program is Free Software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals
+)
+
+import os
+import shutil
+import tempfile
+import unittest
+from itertools import islice
+
+import pytest
+from chessboard import SolverContext
+from chessboard.checkpoint import Checkpoint
+from chessboard.solver import SearchTree
+
+
+class TestCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, 'search.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def check_resume(self, pieces, symmetry=None, workers=1, **options):
+        """ Interrupt a search at all steps and check its resumption. """
+        pieces = dict(pieces, **options)
+        # Checkpointed searches go partition by partition, which changes the
+        # order of custom square orders.
+        expected = list(SolverContext(**pieces).solutions(
+            symmetry, checkpoint=Checkpoint(self.path, interval=3600)))
+        assert sorted(expected) == sorted(
+            SolverContext(**pieces).solutions(symmetry))
+        for interruption in range(len(expected) + 1):
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            solver = SolverContext(**pieces)
+            solutions = solver.solutions(
+                symmetry, workers, Checkpoint(self.path, interval=0))
+            produced = list(islice(solutions, interruption))
+            solutions.close()
+            # An unstarted search leaves no checkpoint behind.
+            if interruption:
+                checkpoint = Checkpoint.load(self.path, interval=0)
+            else:
+                checkpoint = Checkpoint(self.path, interval=0)
+            # Closing the search accounts for the last solution produced.
+            assert checkpoint.result_counter == interruption
+            solver = SolverContext(**pieces)
+            produced += list(solver.solutions(symmetry, workers, checkpoint))
+            assert produced == expected
+            assert solver.result_counter == len(expected)
+            assert Checkpoint.load(self.path).root == solver.vector_size
+
+    def test_resume(self):
+        self.check_resume({'length': 3, 'height': 3, 'king': 2, 'rook': 1})
+        self.check_resume(
+            {'length': 4, 'height': 4, 'rook': 2, 'knight': 4}, 'expand')
+        self.check_resume(
+            {'length': 5, 'height': 5, 'queen': 5}, 'fundamental')
+
+    def test_resume_engines(self):
+        for engine in ('backtracking', 'numpy', 'dlx', 'rows'):
+            self.check_resume(
+                {'length': 5, 'height': 5, 'queen': 5}, engine=engine)
+            self.check_resume(
+                {'length': 5, 'height': 5, 'queen': 5}, 'expand',
+                engine=engine)
+        pieces = {'length': 4, 'height': 4, 'king': 1, 'rook': 2, 'knight': 1}
+        self.check_resume(pieces, square_order='center-out')
+        self.check_resume(pieces, piece_order='dynamic')
+        self.check_resume(pieces, 'fundamental', engine='numpy')
+
+    def test_resume_from_cursor(self):
+        """ The interrupted partition is not searched again. """
+        pieces = {'length': 5, 'height': 5, 'king': 2, 'queen': 1, 'knight': 2}
+        # Count descents in the search tree.
+        place = SearchTree.place
+        descents = []
+
+        def counted_place(tree, level, index, safe):
+            descents.append(level)
+            return place(tree, level, index, safe)
+
+        SearchTree.place = counted_place
+        try:
+            expected = list(SolverContext(**pieces).solutions(
+                checkpoint=Checkpoint(self.path, interval=3600)))
+            total_descents = len(descents)
+            os.remove(self.path)
+            del descents[:]
+
+            # Interrupt the search in the middle of the first partition.
+            interruption = len([
+                placement for placement in expected
+                if placement[0] == 0]) // 2
+            solutions = SolverContext(**pieces).solutions(
+                checkpoint=Checkpoint(self.path, interval=3600))
+            produced = list(islice(solutions, interruption))
+            solutions.close()
+            checkpoint = Checkpoint.load(self.path)
+            assert checkpoint.root == 0
+            assert checkpoint.cursor == produced[-1]
+
+            produced += list(SolverContext(**pieces).solutions(
+                checkpoint=checkpoint))
+        finally:
+            SearchTree.place = place
+        assert produced == expected
+        # Only the descents leading to the cursor's leaf are replayed.
+        assert len(descents) == total_descents + len(produced[-1]) - 1
+
+    def test_resume_parallel(self):
+        self.check_resume(
+            {'length': 4, 'height': 4, 'rook': 2, 'knight': 4}, workers=2)
+
+    def test_mismatch(self):
+        solver = SolverContext(3, 3, king=2, rook=1)
+        list(solver.solutions(checkpoint=Checkpoint(self.path)))
+        checkpoint = Checkpoint.load(self.path)
+        solver = SolverContext(3, 3, king=2, rook=2)
+        with pytest.raises(ValueError):
+            list(solver.solutions(checkpoint=checkpoint))
+        with pytest.raises(ValueError):
+            checkpoint.bind(solver.search_params('fundamental'))
+
+    def test_save_interval(self):
+        checkpoint = Checkpoint(self.path, interval=3600)
+        checkpoint.bind({})
+        checkpoint.update(1, (2, 3), 4)
+        assert not os.path.exists(self.path)
+        flushed = []
+        checkpoint.before_save = lambda: flushed.append(True)
+        checkpoint.update(5, (6, 7), 8, force=True)
+        assert flushed
+        restored = Checkpoint.load(self.path)
+        assert (restored.root, restored.cursor, restored.result_counter) == (
+            5, (6, 7), 8)
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015-2017 Kevin Deldycke <kevin@deldycke.com>
+#                         and contributors.
+# All Rights Reserved.
+#
+# This program is Free Software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals
+)
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+import chessboard
+from chessboard import SolverContext
+from chessboard.formats import PIECE_RECORD, decode_binary
+
+
+def run_cli(*args, **kwargs):
+    """ Run the CLI in its own process, and return its standard output and
+    error as bytes. The ``stdin`` keyword argument is fed to its standard
+    input. """
+    env = os.environ.copy()
+    root = os.path.dirname(os.path.dirname(os.path.abspath(
+        chessboard.__file__)))
+    env['PYTHONPATH'] = os.pathsep.join(
+        [root] + [path for path in [env.get('PYTHONPATH')] if path])
+    command = [sys.executable, '-c', 'from chessboard.cli import cli; cli()']
+    command.extend(args)
+    process = subprocess.Popen(
+        command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE, env=env)
+    stdout, stderr = process.communicate(kwargs.get('stdin', b''))
+    assert process.returncode == 0
+    return stdout, stderr
+
+
+class TestCLI(unittest.TestCase):
+
+    puzzle = ['solve', '-l', '6', '-h', '6', '--queen', '6']
+
+    def test_binary_output(self):
+        stdout, stderr = run_cli(*self.puzzle + ['--format', 'binary'])
+        # Logs don't corrupt the stream of records.
+        assert b'Searching positions' in stderr
+        size = 6 * PIECE_RECORD.size
+        assert len(stdout) % size == 0
+        solutions = [
+            decode_binary(stdout[offset:offset + size])
+            for offset in range(0, len(stdout), size)]
+        solver = SolverContext(6, 6, queen=6)
+        assert solutions == [
+            tuple(zip(solver.population, placement))
+            for placement in solver.solutions()]
+
+    def test_jsonl_output(self):
+        stdout, stderr = run_cli(*self.puzzle + ['--format', 'jsonl'])
+        assert b'Searching positions' in stderr
+        solutions = [
+            json.loads(line) for line in stdout.decode('utf-8').splitlines()]
+        assert len(solutions) == 4
+        assert all(list(solution) == ['queen'] for solution in solutions)
+
+    def test_batch_malformed_lines(self):
+        for jobs in ('1', '2'):
+            stdout, _ = run_cli('solve-batch', '-c', '-j', jobs, stdin=(
+                b'{"id": "a", "length": 3, "height": 3, "queen": 2}\n'
+                b'not json\n'
+                b'{"length": 4, "height": 4, "queen": 4}\n'))
+            results = sorted(
+                (json.loads(line) for line in stdout.decode(
+                    'utf-8').splitlines()),
+                key=lambda result: str(result['id']))
+            assert [result['id'] for result in results] == [2, 3, 'a']
+            assert 'error' in results[0]
+            assert results[1]['count'] == 2
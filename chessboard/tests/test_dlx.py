@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015-2017 Kevin Deldycke <kevin@deldycke.com>
+#                         and contributors.
+# All Rights Reserved.
+#
+# This program is Free Software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals
+)
+
+import unittest
+
+from chessboard.dlx import DancingLinks
+
+
+class TestDancingLinks(unittest.TestCase):
+
+    # Exact cover problem from Knuth's paper, with columns A to G numbered
+    # from 0 to 6.
+    knuth_options = [
+        [2, 4, 5],
+        [0, 3, 6],
+        [1, 2, 5],
+        [0, 3],
+        [1, 6],
+        [3, 4, 6]]
+
+    def test_exact_cover(self):
+        links = DancingLinks(7, 0, self.knuth_options)
+        assert [sorted(s) for s in links.solutions()] == [[0, 3, 4]]
+        assert links.count() == 1
+
+    def test_links_restored(self):
+        links = DancingLinks(7, 0, self.knuth_options)
+        state = (links.left[:], links.right[:], links.up[:], links.down[:])
+        list(links.solutions())
+        assert state == (links.left, links.right, links.up, links.down)
+
+    def test_secondary_columns(self):
+        # Column 2 is secondary: it can be left uncovered, but not covered
+        # twice.
+        links = DancingLinks(2, 1, [[0, 2], [1, 2], [0], [1]])
+        assert sorted(sorted(s) for s in links.solutions()) == [
+            [0, 3], [1, 2], [2, 3]]
+        assert links.count() == 3
+
+    def test_select(self):
+        links = DancingLinks(2, 1, [[0, 2], [1, 2], [0], [1]])
+        links.select(3)
+        assert sorted(sorted(s) for s in links.solutions()) == [[0], [2]]
+
+    def test_no_solution(self):
+        links = DancingLinks(3, 0, [[0, 1], [1, 2]])
+        assert list(links.solutions()) == []
+        assert links.count() == 0
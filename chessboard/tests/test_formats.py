@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015-2017 Kevin Deldycke <kevin@deldycke.com>
+#                         and contributors.
+# All Rights Reserved.
+#
+# This program is Free Software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals
+)
+
+import json
+import unittest
+
+from chessboard import King, Rook, SolverContext
+from chessboard.formats import (
+    ENCODERS,
+    decode_binary,
+    encode_binary,
+    encode_jsonl,
+    encode_tuples
+)
+
+
+class TestFormats(unittest.TestCase):
+
+    population = (Rook.uid, King.uid, King.uid)
+    placement = (1, 6, 8)
+
+    def test_tuples(self):
+        assert encode_tuples(self.population, self.placement) == \
+            '(1, 1) (3, 6) (3, 8)\n'
+
+    def test_jsonl(self):
+        line = encode_jsonl(self.population, self.placement)
+        assert line == '{"rook":[1],"king":[6,8]}\n'
+        assert json.loads(line) == {'rook': [1], 'king': [6, 8]}
+
+    def test_binary(self):
+        record = encode_binary(self.population, self.placement)
+        assert record == b'\x01\x01\x00\x03\x06\x00\x03\x08\x00'
+        assert decode_binary(record) == ((1, 1), (3, 6), (3, 8))
+
+    def test_wide_index(self):
+        record = encode_binary((King.uid, ), (1000, ))
+        assert decode_binary(record) == ((King.uid, 1000), )
+
+    def test_all_solutions(self):
+        solver = SolverContext(4, 4, rook=2, knight=4)
+        population = solver.population
+        for encoder in ENCODERS.values():
+            lines = [
+                encoder(population, placement)
+                for placement in solver.solutions()]
+            assert len(lines) == 8
+            assert len(set(lines)) == 8
@@ -82,6 +82,15 @@ class TestKing(unittest.TestCase):
             True, True, False,
         ]
 
+    def test_bitmask(self):
+        """ Test territory packed as bitmask is aligned with its vector. """
+        board = Board(3, 3)
+        for index in board.indexes:
+            king = King(board, index)
+            assert board.bitmask_to_vector(king.bitmask) == king.territory
+        assert King(board, 0).bitmask == 0b000011011
+        assert King(board, 4).bitmask == 0b111111111
+
 
 class TestQueen(unittest.TestCase):
 
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015-2017 Kevin Deldycke <kevin@deldycke.com>
+#                         and contributors.
+# All Rights Reserved.
+#
+# This program is Free Software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals
+)
+
+import cProfile
+import io
+import os
+import pstats
+import shutil
+import tempfile
+import unittest
+
+from chessboard import SolverContext
+from chessboard.profiling import (
+    collapse_stacks,
+    function_label,
+    profiled_iteration,
+    write_profiles
+)
+
+
+def consume(items):
+    """ Dummy consumer of solutions, to be kept out of search profiles. """
+    return len(items)
+
+
+class TestProfiling(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def profile_search(self):
+        """ Profile the search of a small puzzle, without its consumer. """
+        profile = cProfile.Profile()
+        solver = SolverContext(5, 5, king=2, queen=1, knight=2)
+        for placement in profiled_iteration(solver.solutions(), profile):
+            consume(placement)
+        return profile
+
+    def test_profiled_iteration(self):
+        functions = set(
+            name for _, _, name in pstats.Stats(
+                self.profile_search()).stats)
+        assert 'placements' in functions
+        assert 'consume' not in functions
+
+    def test_collapse_stacks(self):
+        stats = pstats.Stats(self.profile_search())
+        stacks = collapse_stacks(stats)
+        functions = set(function for stack in stacks for function in stack)
+        assert 'place' in set(name for _, _, name in functions)
+        # Time of all functions is split between their stacks.
+        for function in functions:
+            collapsed = sum(
+                duration for stack, duration in stacks.items()
+                if stack[-1] == function)
+            assert collapsed <= stats.stats[function][2] + 0.000001
+
+    def test_write_profiles(self):
+        prefix = os.path.join(self.folder, 'profile')
+        pstats_path, collapsed_path = write_profiles(
+            self.profile_search(), prefix)
+        assert pstats_path == prefix + '.pstats'
+        assert collapsed_path == prefix + '.collapsed'
+        assert pstats.Stats(pstats_path).total_calls
+        with io.open(collapsed_path, encoding='utf-8') as collapsed:
+            lines = collapsed.read().splitlines()
+        assert lines
+        for line in lines:
+            stack, microseconds = line.rsplit(' ', 1)
+            assert int(microseconds) > 0
+            assert all(stack.split(';'))
+
+    def test_function_label(self):
+        assert function_label(
+            ('/tmp/chessboard/solver.py', 12, 'count')) == 'solver.py:12:count'
+        assert function_label(
+            ('~', 0, "<built-in method builtins.bin>")) == \
+            '<built-in method builtins.bin>'
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015-2017 Kevin Deldycke <kevin@deldycke.com>
+#                         and contributors.
+# All Rights Reserved.
+#
+# This program is Free Software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals
+)
+
+import os
+import shutil
+import tempfile
+import unittest
+from itertools import islice
+
+from chessboard import King, Rook, SolverContext
+from chessboard.results import ResultCache, transpose
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.cache = ResultCache(os.path.join(self.folder, 'results.db'))
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.folder)
+
+    def test_transpose(self):
+        population = (Rook.uid, King.uid, King.uid)
+        # 3x2 board to 2x3 board.
+        assert transpose(population, (0, 1, 5), 3, 2) == (0, 2, 5)
+        assert transpose(population, (0, 2, 5), 2, 3) == (0, 1, 5)
+
+    def test_key(self):
+        key, transposed = ResultCache.key(
+            SolverContext(5, 3, king=2, rook=1, knight=0), 'expand')
+        assert transposed
+        assert (key, False) == ResultCache.key(
+            SolverContext(3, 5, rook=1, king=2, engine='numpy'), 'expand')
+        assert key != ResultCache.key(
+            SolverContext(3, 5, rook=1, king=2))[0]
+
+    def test_solutions(self):
+        pieces = {'king': 2, 'rook': 1, 'knight': 1}
+        for symmetry in (None, 'fundamental', 'expand'):
+            for length, height in ((5, 3), (3, 5), (5, 3)):
+                expected = list(SolverContext(
+                    length, height, engine='backtracking',
+                    **pieces).solutions(symmetry))
+                solver = SolverContext(length, height, **pieces)
+                assert list(solver.solutions(
+                    symmetry, cache=self.cache)) == expected
+                assert solver.result_counter == len(expected)
+                count, placements = self.cache.get(solver, symmetry)
+                assert count == len(expected)
+                assert sorted(placements) == sorted(set(expected))
+
+    def test_interrupted_search(self):
+        solver = SolverContext(4, 4, queen=4)
+        assert len(list(islice(solver.solutions(cache=self.cache), 1))) == 1
+        assert self.cache.get(solver) is None
+
+    def test_max_solutions(self):
+        self.cache.max_solutions = 5
+        solver = SolverContext(6, 6, queen=6)
+        assert len(list(solver.solutions(cache=self.cache))) == 4
+        solver = SolverContext(5, 5, queen=5)
+        assert len(list(solver.solutions(cache=self.cache))) == 10
+        assert self.cache.get(solver) == (10, None)
+        # Cached solutions are not replaced by a count alone.
+        self.cache.put(SolverContext(6, 6, queen=6), None, 4)
+        assert self.cache.get(SolverContext(6, 6, queen=6))[1] is not None
+
+    def test_count(self):
+        solver = SolverContext(4, 3, king=3, knight=1)
+        expected = solver.count()
+        assert self.cache.get(solver) is None
+        assert solver.count(cache=self.cache) == expected
+        assert self.cache.get(solver) == (expected, None)
+
+        # Served from the cache.
+        solver = SolverContext(3, 4, king=3, knight=1)
+        self.cache.put(solver, None, expected + 1)
+        assert solver.count(cache=self.cache) == expected
+        self.cache.connection.execute('DELETE FROM results')
+        self.cache.put(solver, None, expected + 1)
+        assert solver.count(cache=self.cache) == expected + 1
+        assert solver.result_counter == expected + 1
+
+        # Statistics and partial counts bypass the cache.
+        solver = SolverContext(3, 4, king=3, knight=1, collect_stats=True)
+        assert solver.count(cache=self.cache) == expected
+        solver = SolverContext(3, 4, king=3, knight=1)
+        assert solver.count(roots=[0], cache=self.cache) < expected
+
+    def test_persistence(self):
+        solver = SolverContext(6, 6, queen=6)
+        solver.count(cache=self.cache)
+        self.cache.close()
+        self.cache = ResultCache(self.cache.path)
+        assert self.cache.get(solver) == (4, None)
+
+    def test_solve(self):
+        expected = list(SolverContext(3, 2, knight=2).solve())
+        assert list(SolverContext(3, 2, knight=2).solve(
+            cache=self.cache)) == expected
+        assert self.cache.get(SolverContext(2, 3, knight=2))[0] == len(
+            expected)
+        assert list(SolverContext(3, 2, knight=2).solve(
+            cache=self.cache)) == expected
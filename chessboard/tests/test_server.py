@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015-2017 Kevin Deldycke <kevin@deldycke.com>
+#                         and contributors.
+# All Rights Reserved.
+#
+# This program is Free Software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals
+)
+
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+
+import pytest
+from chessboard.batch import solve_puzzle
+
+# Unix domain sockets are not available on Windows.
+if hasattr(socket, 'AF_UNIX'):
+    from chessboard.server import SolverClient, SolverServer
+
+
+@pytest.mark.skipif(
+    not hasattr(socket, 'AF_UNIX'), reason='Requires Unix domain sockets.')
+class TestServer(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, 'solver.sock')
+        self.server = SolverServer(self.path, workers=2)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.thread.join()
+        self.server.server_close()
+        assert not os.path.exists(self.path)
+        shutil.rmtree(self.folder)
+
+    def test_solve(self):
+        puzzles = [
+            {'id': 'tiny', 'length': 3, 'height': 3, 'king': 2, 'rook': 1},
+            {'id': 'count', 'length': 8, 'height': 8, 'queen': 8,
+             'count_only': True},
+            {'id': 'limit', 'length': 8, 'height': 8, 'queen': 8,
+             'limit': 5, 'symmetry': 'fundamental'},
+            {'id': 'invalid', 'length': 8, 'height': 8, 'dragon': 8}]
+        # Several puzzles per connection, and several connections.
+        for _ in range(2):
+            with SolverClient(self.path) as client:
+                for puzzle in puzzles:
+                    assert client.solve(puzzle) == solve_puzzle(puzzle)
+
+    def test_concurrent_clients(self):
+        clients = [SolverClient(self.path) for _ in range(3)]
+        try:
+            # Send all puzzles before reading any result.
+            for size, client in enumerate(clients, 4):
+                client.stream.write(
+                    '{{"length": {0}, "height": {0}, "queen": {0}}}\n'.format(
+                        size).encode('utf-8'))
+                client.stream.flush()
+            counts = [
+                json.loads(client.stream.readline().decode('utf-8'))['count']
+                for client in clients]
+        finally:
+            for client in clients:
+                client.close()
+        assert counts == [2, 10, 4]
+
+    def test_invalid_request(self):
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client.connect(self.path)
+        stream = client.makefile('rwb')
+        try:
+            stream.write(b'\nnot json\n[1, 2]\n')
+            stream.flush()
+            for number in (2, 3):
+                assert stream.readline().startswith(
+                    '{{"id":{},"error":"ValueError: '.format(number).encode(
+                        'utf-8'))
+        finally:
+            stream.close()
+            client.close()
+
+    def test_socket_in_use(self):
+        with pytest.raises(ValueError):
+            SolverServer(self.path)
+
+    def test_stale_socket(self):
+        path = os.path.join(self.folder, 'stale.sock')
+        # Left behind by a dead server.
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(path)
+        stale.close()
+        server = SolverServer(path)
+        server.server_close()
+        assert not os.path.exists(path)
+
+    def test_regular_file(self):
+        path = os.path.join(self.folder, 'puzzles.jsonl')
+        with open(path, 'w') as puzzles:
+            puzzles.write('{"length": 3, "height": 3, "king": 1}\n')
+        with pytest.raises(ValueError):
+            SolverServer(path)
+        # The file is left untouched.
+        with open(path) as puzzles:
+            assert puzzles.read() == '{"length": 3, "height": 3, "king": 1}\n'
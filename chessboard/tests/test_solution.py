@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015-2017 Kevin Deldycke <kevin@deldycke.com>
+#                         and contributors.
+# All Rights Reserved.
+#
+# This program is Free Software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals
+)
+
+import pickle
+import unittest
+
+import pytest
+from chessboard import King, Rook, Solution, SolverContext
+
+
+class TestSolution(unittest.TestCase):
+
+    def test_solve(self):
+        solver = SolverContext(3, 3, king=2, rook=1)
+        solutions = list(solver.solve())
+        # Retained solutions are distinct snapshots.
+        assert [s.placement for s in solutions] == list(
+            SolverContext(3, 3, king=2, rook=1).solutions())
+        assert len(set(solutions)) == 4
+        assert solutions[0].positions == (
+            (Rook.uid, 1), (King.uid, 6), (King.uid, 8))
+        # Population is shared by all solutions of a solver.
+        assert all(
+            s.population is solutions[0].population for s in solutions)
+
+    def test_immutability(self):
+        solution = Solution(3, 3, (King.uid, ), (4, ))
+        with pytest.raises(AttributeError):
+            solution.length = 4
+        with pytest.raises(AttributeError):
+            solution.extra = None
+        with pytest.raises(AttributeError):
+            del solution.placement
+
+    def test_equality(self):
+        solution = Solution(3, 3, (King.uid, Rook.uid), (0, 8))
+        assert solution == Solution(3, 3, [King.uid, Rook.uid], [0, 8])
+        assert solution != Solution(3, 3, (King.uid, Rook.uid), (8, 0))
+        assert solution != Solution(3, 4, (King.uid, Rook.uid), (0, 8))
+        assert len(set([
+            solution, Solution(3, 3, (King.uid, Rook.uid), (0, 8))])) == 1
+
+    def test_pickle(self):
+        solution = Solution(3, 3, (King.uid, Rook.uid), (0, 8))
+        assert pickle.loads(pickle.dumps(solution)) == solution
+
+    def test_board(self):
+        solution = Solution(3, 2, (King.uid, Rook.uid), (0, 5))
+        board = solution.board
+        assert board.get(0, 0).uid == King.uid
+        assert board.get(2, 1).uid == Rook.uid
+        # Each conversion produces a new board.
+        assert solution.board is not board
+        assert str(solution) == str(board)
+        assert set((p.uid, p.index) for p in solution.pieces) == set([
+            (King.uid, 0), (Rook.uid, 5)])
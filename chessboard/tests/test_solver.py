@@ -25,11 +25,24 @@ from __future__ import (
     unicode_literals
 )
 
+import threading
 import unittest
-from itertools import product, repeat
+from itertools import combinations, product, repeat
 from operator import itemgetter
 
-from chessboard import King, Permutations, Queen, SolverContext
+import pytest
+from chessboard import (
+    AttackablePiece,
+    Board,
+    King,
+    OccupiedPosition,
+    Permutations,
+    Queen,
+    SearchCancelled,
+    SolverContext,
+    VulnerablePosition
+)
+from chessboard.solver import SQUARE_ORDERS, SearchTree
 
 from .. import PY2
 
@@ -51,6 +64,20 @@ class TestPermutations(unittest.TestCase):
         assert [list(perm) for perm in gen] == \
             [[('a', 0)], [('a', 1)], [('a', 2)]]
 
+    def test_wide_range(self):
+        for range_size, typecode in [
+                (255, 'B'), (256, 'H'), (65535, 'H'), (65536, 'L')]:
+            gen = Permutations({'a': 1, 'b': 1}, range_size)
+            first = list(next(gen))
+            assert gen.indexes.typecode == typecode
+            assert first == [('a', 0), ('b', 0)]
+            gen.skip_branch(0)
+            assert list(next(gen)) == [('a', 1), ('b', 0)]
+            gen.indexes[0] = range_size - 1
+            gen.skip_branch(0)
+            with pytest.raises(StopIteration):
+                next(gen)
+
     def test_skip_branch(self):
         gen = Permutations({'a': 1, 'b': 1, 'c': 2}, 5)
 
@@ -370,6 +397,66 @@ class TestPermutations(unittest.TestCase):
             [('a', 4), ('b', 4), ('c', 4), ('c', 4)]]
 
 
+class TestSearchTree(unittest.TestCase):
+
+    def brute_force(self, solver):
+        """ Search all valid placements by testing all combinations. """
+        pieces = solver.population
+        results = set()
+        for placement in combinations(range(solver.vector_size), len(pieces)):
+            # Try all assignments of pieces to the set of squares.
+            for ordered in set(product(placement, repeat=len(pieces))):
+                if len(set(ordered)) != len(pieces):
+                    continue
+                board = Board(solver.length, solver.height)
+                try:
+                    for uid, index in zip(pieces, ordered):
+                        board.add(uid, index)
+                except (
+                        OccupiedPosition, VulnerablePosition,
+                        AttackablePiece):
+                    continue
+                results.add(tuple(sorted(zip(pieces, ordered))))
+        return results
+
+    def test_placements(self):
+        for length, height, pieces in [
+                (3, 3, {'king': 2, 'rook': 1}),
+                (3, 4, {'queen': 1, 'bishop': 1, 'knight': 2}),
+                (4, 3, {'rook': 2, 'king': 1})]:
+            solver = SolverContext(length, height, **pieces)
+            tree = SearchTree(solver)
+            placements = list(tree.placements())
+            # Placements are produced in lexicographic order.
+            assert placements == sorted(placements)
+            assert set(
+                tuple(sorted(zip(solver.population, placement)))
+                for placement in placements) == self.brute_force(solver)
+            assert SearchTree(solver).count() == len(placements)
+
+    def test_safe_squares(self):
+        solver = SolverContext(3, 3, king=1, rook=1)
+        tree = SearchTree(solver)
+        safe = [tree.full] * len(tree.kinds)
+        # Rook placed at top-left corner.
+        safe = tree.place(0, 0, safe)
+        assert safe == [
+            # Rooks can't land on its row and column.
+            0b110110000,
+            # Kings can't either, nor next to it.
+            0b110100000]
+        assert tree.candidates(1, safe, [0, 0]) == 0b110100000
+
+    def test_pruning(self):
+        solver = SolverContext(3, 3, rook=3)
+        tree = SearchTree(solver)
+        full = [tree.full] * len(tree.kinds)
+        # Two squares are left beyond the first rook for the two others.
+        assert tree.feasible(0, 5, tree.place(0, 5, full))
+        # No square is left beyond the first rook.
+        assert not tree.feasible(0, 7, tree.place(0, 7, full))
+
+
 class TestSolverContext(unittest.TestCase):
 
     def test_instanciation(self):
@@ -506,13 +593,309 @@ class TestSolverContext(unittest.TestCase):
         ])
         assert solver.result_counter == 8
 
-    @unittest.skip("Solver too slow")
     def test_eight_queens(self):
         solver = SolverContext(8, 8, queen=8)
         for _ in solver.solve():
             pass
         assert solver.result_counter == 92
 
+    def test_count(self):
+        for length, height, pieces, expected in [
+                (1, 1, {'king': 1}, 1),
+                (3, 3, {'queen': 3}, 0),
+                (3, 3, {'king': 2, 'rook': 1}, 4),
+                (4, 4, {'rook': 2, 'knight': 4}, 8),
+                (5, 5, {'queen': 5}, 10),
+                (8, 8, {'queen': 8}, 92)]:
+            solver = SolverContext(length, height, **pieces)
+            assert solver.count() == expected
+            assert solver.result_counter == expected
+
+    def test_count_aligned_with_solve(self):
+        pieces = {'king': 2, 'queen': 1, 'bishop': 1, 'knight': 1}
+        solver = SolverContext(4, 5, **pieces)
+        for _ in solver.solve():
+            pass
+        assert SolverContext(4, 5, **pieces).count() == solver.result_counter
+
+    def test_fundamental_solutions(self):
+        for length, height, pieces, expected in [
+                (1, 1, {'king': 1}, 1),
+                (3, 3, {'king': 1}, 3),
+                (3, 3, {'queen': 3}, 0),
+                (3, 3, {'king': 2, 'rook': 1}, 1),
+                (4, 4, {'rook': 2, 'knight': 4}, 2),
+                (6, 6, {'queen': 6}, 1),
+                (8, 8, {'queen': 8}, 12)]:
+            solver = SolverContext(length, height, **pieces)
+            assert solver.count(symmetry='fundamental') == expected
+            assert sum(1 for _ in solver.solve(
+                symmetry='fundamental')) == expected
+            assert solver.result_counter == expected
+
+    def test_expanded_solutions(self):
+        for length, height, pieces in [
+                (3, 3, {'king': 2, 'rook': 1}),
+                (4, 4, {'rook': 2, 'knight': 4}),
+                (4, 5, {'king': 2, 'queen': 1, 'bishop': 1, 'knight': 1}),
+                (6, 6, {'queen': 6}),
+                (7, 7, {'queen': 7})]:
+            solver = SolverContext(length, height, **pieces)
+            expected = set(solver.search())
+            assert set(solver.placements(symmetry='expand')) == expected
+            assert solver.count(symmetry='expand') == len(expected)
+
+    def test_symmetric_board_solutions(self):
+        solver = SolverContext(4, 4, rook=2, knight=4)
+        results = solver.solve(symmetry='expand')
+        self.check_results(results, [
+            [('Rook', 0, 3), ('Rook', 2, 1),
+             ('Knight', 1, 0), ('Knight', 3, 0),
+             ('Knight', 1, 2), ('Knight', 3, 2)],
+            [('Rook', 0, 1), ('Rook', 2, 3),
+             ('Knight', 1, 0), ('Knight', 3, 0),
+             ('Knight', 1, 2), ('Knight', 3, 2)],
+            [('Rook', 0, 0), ('Rook', 2, 2),
+             ('Knight', 1, 1), ('Knight', 3, 1),
+             ('Knight', 1, 3), ('Knight', 3, 3)],
+            [('Rook', 0, 2), ('Rook', 2, 0),
+             ('Knight', 1, 1), ('Knight', 3, 1),
+             ('Knight', 1, 3), ('Knight', 3, 3)],
+            [('Rook', 1, 0), ('Rook', 3, 2),
+             ('Knight', 0, 1), ('Knight', 2, 1),
+             ('Knight', 0, 3), ('Knight', 2, 3)],
+            [('Rook', 3, 0), ('Rook', 1, 2),
+             ('Knight', 0, 1), ('Knight', 2, 1),
+             ('Knight', 0, 3), ('Knight', 2, 3)],
+            [('Rook', 1, 3), ('Rook', 3, 1),
+             ('Knight', 0, 0), ('Knight', 2, 0),
+             ('Knight', 0, 2), ('Knight', 2, 2)],
+            [('Rook', 1, 1), ('Rook', 3, 3),
+             ('Knight', 0, 0), ('Knight', 2, 0),
+             ('Knight', 0, 2), ('Knight', 2, 2)],
+        ])
+        assert solver.result_counter == 8
+
+    def test_solutions(self):
+        solver = SolverContext(3, 3, king=2, rook=1)
+        assert list(solver.solutions()) == [
+            (1, 6, 8), (3, 2, 8), (5, 0, 6), (7, 0, 2)]
+        assert solver.result_counter == 4
+
+    def test_parallel_solve(self):
+        for symmetry in (None, 'fundamental', 'expand'):
+            solver = SolverContext(6, 6, queen=6)
+            expected = [
+                sorted((p.uid, p.index) for p in board.pieces)
+                for board in solver.solve(symmetry=symmetry)]
+            solver = SolverContext(6, 6, queen=6)
+            results = [
+                sorted((p.uid, p.index) for p in board.pieces)
+                for board in solver.solve(symmetry=symmetry, workers=2)]
+            # Results are produced in the same order.
+            assert results == expected
+            assert solver.result_counter == len(expected)
+
+    def test_parallel_count(self):
+        pieces = {'king': 2, 'queen': 1, 'bishop': 1, 'knight': 1}
+        solver = SolverContext(4, 5, **pieces)
+        assert solver.count(workers=2) == 412
+        assert solver.result_counter == 412
+        assert solver.count(symmetry='expand', workers=2) == 412
+        assert solver.count(symmetry='fundamental', workers=2) == 103
+
+    def test_numpy_engine(self):
+        for length, height, pieces in [
+                (1, 1, {'king': 1}),
+                (3, 3, {'king': 2, 'rook': 1}),
+                (4, 4, {'rook': 2, 'knight': 4}),
+                (4, 5, {'king': 2, 'queen': 1, 'bishop': 1, 'knight': 1}),
+                (6, 6, {'queen': 6})]:
+            solver = SolverContext(length, height, **pieces)
+            vectorized = SolverContext(
+                length, height, engine='numpy', **pieces)
+            expected = list(solver.search())
+            # Same traversal, so same order.
+            assert list(vectorized.search()) == expected
+            assert vectorized.count() == len(expected)
+            for symmetry in ('fundamental', 'expand'):
+                assert list(vectorized.placements(symmetry)) == \
+                    list(solver.placements(symmetry))
+                assert vectorized.count(symmetry) == solver.count(symmetry)
+
+    def test_dynamic_piece_order(self):
+        for length, height, pieces in [
+                (1, 1, {'king': 1}),
+                (3, 3, {'king': 2, 'rook': 1}),
+                (4, 4, {'rook': 2, 'knight': 4}),
+                (4, 5, {'king': 2, 'queen': 1, 'bishop': 1, 'knight': 1}),
+                (5, 5, {'king': 1, 'rook': 2, 'knight': 4}),
+                (6, 6, {'queen': 6})]:
+            solver = SolverContext(length, height, **pieces)
+            dynamic = SolverContext(
+                length, height, piece_order='dynamic', **pieces)
+            expected = list(solver.search())
+            # Same solutions, aligned with the population, but produced in
+            # another order.
+            results = list(dynamic.search())
+            assert sorted(results) == sorted(expected)
+            assert len(set(results)) == len(results)
+            assert dynamic.count() == len(expected)
+            for symmetry in ('fundamental', 'expand'):
+                assert sorted(dynamic.placements(symmetry)) == \
+                    sorted(solver.placements(symmetry))
+                assert dynamic.count(symmetry) == solver.count(symmetry)
+        # Parallel search keeps the sequential order.
+        dynamic = SolverContext(
+            4, 5, piece_order='dynamic',
+            king=2, queen=1, bishop=1, knight=1)
+        assert list(dynamic.solutions(workers=2)) == list(dynamic.solutions())
+        with pytest.raises(ValueError):
+            SolverContext(4, 4, queen=4, engine='numpy', piece_order='dynamic')
+
+    def test_square_sequence(self):
+        solver = SolverContext(3, 3, king=1)
+        assert solver.square_sequence(King.uid) == list(range(9))
+        solver = SolverContext(3, 3, king=1, square_order='center-out')
+        assert solver.square_sequence(King.uid) == [
+            4, 1, 3, 5, 7, 0, 2, 6, 8]
+        solver = SolverContext(4, 3, king=1, square_order='edges-first')
+        assert solver.square_sequence(King.uid) == [
+            0, 1, 2, 3, 4, 7, 8, 9, 10, 11, 5, 6]
+        solver = SolverContext(
+            3, 3, queen=1, square_order='least-constraining')
+        assert solver.square_sequence(Queen.uid) == [
+            0, 1, 2, 3, 5, 6, 7, 8, 4]
+
+    def test_square_orders(self):
+        for length, height, pieces in [
+                (1, 1, {'king': 1}),
+                (3, 3, {'king': 2, 'rook': 1}),
+                (4, 4, {'rook': 2, 'knight': 4}),
+                (4, 5, {'king': 2, 'queen': 1, 'bishop': 1, 'knight': 1}),
+                (6, 6, {'queen': 6})]:
+            solver = SolverContext(length, height, **pieces)
+            expected = sorted(solver.search())
+            for square_order in SQUARE_ORDERS:
+                ordered = SolverContext(
+                    length, height, square_order=square_order, **pieces)
+                results = list(ordered.search())
+                assert sorted(results) == expected
+                assert len(set(results)) == len(results)
+                assert ordered.count() == len(expected)
+                for symmetry in ('fundamental', 'expand'):
+                    assert sorted(ordered.placements(symmetry)) == \
+                        sorted(solver.placements(symmetry))
+                    assert ordered.count(symmetry) == solver.count(symmetry)
+        with pytest.raises(ValueError):
+            SolverContext(
+                4, 4, queen=4, engine='numpy', square_order='center-out')
+
+    def test_exact_cover(self):
+        assert SolverContext(8, 8, queen=8).exact_cover
+        assert SolverContext(5, 3, rook=3).exact_cover
+        assert SolverContext(5, 3, queen=5).exact_cover
+        assert not SolverContext(5, 3, queen=4).exact_cover
+        assert not SolverContext(4, 4, queen=2, rook=2).exact_cover
+        assert not SolverContext(4, 4, king=4).exact_cover
+        with self.assertRaises(ValueError):
+            SolverContext(4, 4, king=4, engine='dlx')
+
+    def test_dlx_engine(self):
+        for length, height, pieces in [
+                (1, 1, {'queen': 1}),
+                (3, 3, {'queen': 3}),
+                (5, 3, {'queen': 3}),
+                (3, 5, {'queen': 3}),
+                (4, 3, {'rook': 3}),
+                (4, 4, {'rook': 4}),
+                (7, 7, {'queen': 7})]:
+            solver = SolverContext(
+                length, height, engine='backtracking', **pieces)
+            dlx = SolverContext(length, height, engine='dlx', **pieces)
+            expected = list(solver.search())
+            assert sorted(dlx.search()) == expected
+            assert dlx.count() == len(expected)
+            for symmetry in ('fundamental', 'expand'):
+                assert sorted(dlx.placements(symmetry)) == \
+                    sorted(solver.placements(symmetry))
+
+    def test_rows_engine(self):
+        for length, height, pieces in [
+                (1, 1, {'queen': 1}),
+                (3, 3, {'queen': 3}),
+                (5, 3, {'queen': 3}),
+                (3, 5, {'queen': 3}),
+                (4, 3, {'rook': 3}),
+                (3, 4, {'rook': 3}),
+                (4, 4, {'rook': 4}),
+                (6, 4, {'queen': 4}),
+                (7, 7, {'queen': 7})]:
+            solver = SolverContext(
+                length, height, engine='backtracking', **pieces)
+            rows = SolverContext(length, height, engine='rows', **pieces)
+            expected = list(solver.search())
+            assert sorted(rows.search()) == expected
+            assert rows.count() == len(expected)
+            for symmetry in ('fundamental', 'expand'):
+                assert sorted(rows.placements(symmetry)) == \
+                    sorted(solver.placements(symmetry))
+                assert rows.count(symmetry) == solver.count(symmetry)
+            assert rows.count(workers=2) == len(expected)
+            assert list(rows.solutions(workers=2)) == list(rows.solutions())
+        with pytest.raises(ValueError):
+            SolverContext(4, 4, king=4, engine='rows')
+
+    def test_auto_engine(self):
+        assert SolverContext(8, 8, queen=8).engine == 'rows'
+        assert SolverContext(5, 3, rook=5).engine == 'rows'
+        assert SolverContext(8, 8, queen=7).engine == 'backtracking'
+        assert SolverContext(4, 4, queen=2, rook=2).engine == 'backtracking'
+        assert SolverContext(
+            8, 8, queen=8, collect_stats=True).engine == 'rows'
+        assert SolverContext(
+            8, 8, queen=8, piece_order='dynamic').engine == 'backtracking'
+        assert SolverContext(
+            8, 8, queen=8, square_order='center-out').engine == 'backtracking'
+        assert SolverContext(12, 12, queen=12).count() == 14200
+
+    def test_cancellation(self):
+        for engine, piece_order, square_order in [
+                ('backtracking', 'static', 'row-major'),
+                ('backtracking', 'dynamic', 'row-major'),
+                ('backtracking', 'static', 'center-out'),
+                ('numpy', 'static', 'row-major'),
+                ('dlx', 'static', 'row-major'),
+                ('rows', 'static', 'row-major')]:
+            solver = SolverContext(
+                8, 8, queen=8, engine=engine, piece_order=piece_order,
+                square_order=square_order)
+            solver.cancellation = threading.Event()
+            solutions = solver.solutions()
+            assert next(solutions)
+            # Searches stop at the next node, before their next solution.
+            solver.cancellation.set()
+            with pytest.raises(SearchCancelled):
+                next(solutions)
+
+    def test_dlx_solve(self):
+        solver = SolverContext(8, 8, queen=8, engine='dlx')
+        for _ in solver.solve():
+            pass
+        assert solver.result_counter == 92
+        assert solver.count(workers=2) == 92
+
+    def test_large_boards(self):
+        for length, height, pieces, expected in [
+                (16, 16, {'king': 1}, 256),
+                (20, 20, {'king': 1, 'knight': 1}, 153900),
+                (32, 32, {'king': 2}, 519870)]:
+            solver = SolverContext(length, height, **pieces)
+            assert solver.count() == expected
+            assert solver.count(symmetry='expand') == expected
+        solutions = list(SolverContext(20, 20, king=1, knight=1).solve())
+        assert max(index for s in solutions for index in s.placement) == 399
+
     @unittest.skip("Solver too slow")
     def test_big_family(self):
         solver = SolverContext(7, 7, king=2, queen=2, bishop=2, knight=1)
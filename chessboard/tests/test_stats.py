@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015-2017 Kevin Deldycke <kevin@deldycke.com>
+#                         and contributors.
+# All Rights Reserved.
+#
+# This program is Free Software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+
+from __future__ import (
+    absolute_import,
+    division,
+    print_function,
+    unicode_literals
+)
+
+import unittest
+
+from chessboard import SolverContext
+from chessboard.stats import SearchStats
+
+
+class TestSearchStats(unittest.TestCase):
+
+    def test_merge(self):
+        stats = SearchStats(2)
+        other = SearchStats(2)
+        other.nodes[1] = 3
+        other.prunes[0] = 5
+        stats.merge(other)
+        stats.merge(other)
+        assert stats.nodes == [0, 6]
+        assert stats.prunes == [10, 0]
+        assert stats.total_nodes == 6
+        assert stats.total_prunes == 10
+
+    def test_report(self):
+        stats = SearchStats(3)
+        stats.nodes = [2, 3, 5]
+        lines = stats.report(elapsed=2).splitlines()
+        # Header, one line per level, total and throughput.
+        assert len(lines) == 6
+        assert lines[0].split() == ['Level', 'Nodes', 'Prunes']
+        assert lines[4].split()[:2] == ['Total', '10']
+        assert lines[5] == '5 nodes per second.'
+
+    def test_solver_stats(self):
+        pieces = {'king': 2, 'queen': 1, 'bishop': 1, 'knight': 1}
+        solver = SolverContext(4, 5, collect_stats=True, **pieces)
+        assert solver.count() == 412
+        stats = solver.stats
+        # Solutions are the nodes of the last level.
+        assert stats.nodes[-1] == 412
+        assert stats.prunes[-1] == 0
+        # Pruned nodes are not expanded.
+        for level in range(stats.depth - 1):
+            assert stats.prunes[level] <= stats.nodes[level]
+        assert stats.nodes[1] > 0
+
+    def test_engines(self):
+        """ All engines count the nodes of their own tree, without switching
+        to another. """
+        for engine, options in [
+                ('auto', {}),
+                ('backtracking', {}),
+                ('backtracking', {'piece_order': 'dynamic'}),
+                ('backtracking', {'square_order': 'center-out'}),
+                ('numpy', {}),
+                ('dlx', {}),
+                ('rows', {})]:
+            solver = SolverContext(
+                6, 6, queen=6, engine=engine, collect_stats=True, **options)
+            assert solver.engine == 'rows' if engine == 'auto' else engine
+            assert solver.count() == 4
+            stats = solver.stats
+            assert stats.nodes[-1] == 4
+            assert stats.prunes[-1] == 0
+            assert stats.total_nodes > 4
+            # Dead ends are found before the last level.
+            assert stats.total_prunes > 0
+            for workers in (1, 2):
+                assert len(list(solver.solutions(workers=workers))) == 4
+                assert repr(solver.stats) == repr(stats)
+
+    def test_solver_stats_consistency(self):
+        for symmetry in (None, 'fundamental'):
+            expected = SolverContext(
+                6, 6, queen=6, engine='backtracking', collect_stats=True)
+            expected.count(symmetry)
+            for engine, workers in [
+                    ('backtracking', 2), ('numpy', 1), ('numpy', 2)]:
+                solver = SolverContext(
+                    6, 6, queen=6, engine=engine, collect_stats=True)
+                solver.count(symmetry, workers)
+                assert repr(solver.stats) == repr(expected.stats)
+                list(solver.solutions(symmetry, workers))
+                assert repr(solver.stats) == repr(expected.stats)
+
+    def test_disabled(self):
+        solver = SolverContext(4, 4, queen=4)
+        solver.count()
+        assert solver.stats is None